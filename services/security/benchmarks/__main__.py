@@ -0,0 +1,124 @@
+from contextlib import nullcontext
+import argparse
+import asyncio
+import json
+import logging
+import os
+import platform
+import sys
+import time
+from services.security.benchmarks.environment import configure, ephemeral_postgres, seed_scale, sqlite_database
+from services.security.benchmarks.scenarios import SCENARIOS
+
+DEFAULT_BASELINE = os.path.join("services", "security", "benchmarks", "baseline.json")
+COMPARABLE_KEYS = ("database", "mode", "users", "roles", "permissions", "concurrency", "workers")
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m services.security.benchmarks")
+    parser.add_argument("--database", choices=["sqlite", "postgres"], default="sqlite",
+                        help="Base efimera: SQLite en un directorio temporal o Postgres local (initdb/pg_ctl)")
+    parser.add_argument("--database-url", default=None,
+                        help="Usa una base existente en lugar de una efimera (requiere --reset, borra todas sus tablas)")
+    parser.add_argument("--reset", action="store_true", help="Confirma que se pueden borrar las tablas de --database-url")
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--roles", type=int, default=20)
+    parser.add_argument("--permissions", type=int, default=50)
+    parser.add_argument("--avatars", type=int, default=100, help="Usuarios con avatar")
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS), help="Escenarios separados por comas")
+    parser.add_argument("--requests", type=int, default=500, help="Peticiones medidas por escenario")
+    parser.add_argument("--warmup", type=int, default=50, help="Peticiones descartadas antes de medir")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--mode", choices=["inprocess", "http"], default="inprocess")
+    parser.add_argument("--workers", type=int, default=2, help="Workers de uvicorn en modo http")
+    parser.add_argument("--clients", type=int, default=2, help="Procesos generadores de carga en modo http")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default=None, help="Archivo donde escribir el reporte JSON")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument("--save-baseline", action="store_true", help="Guarda el reporte como nueva linea base")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Regresion maxima tolerada (0.2 = 20%%)")
+    return parser.parse_args(argv)
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    logging.basicConfig(level=logging.INFO)
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    scenarios = [name.strip() for name in args.scenarios.split(",") if name.strip()]
+    unknown = [name for name in scenarios if name not in SCENARIOS]
+    if unknown:
+        logging.error(f"Escenarios desconocidos: {', '.join(unknown)}")
+        return 2
+    if "avatar" in scenarios and args.avatars <= 0:
+        logging.error("El escenario avatar requiere --avatars mayor a 0")
+        return 2
+    if args.database_url and not args.reset:
+        logging.error("El benchmark borra y recrea todas las tablas de --database-url; confirme con --reset")
+        return 2
+
+    if args.database_url:
+        database = nullcontext(args.database_url)
+    elif args.database == "postgres":
+        database = ephemeral_postgres()
+    else:
+        database = sqlite_database()
+
+    with database as database_url:
+        configure(database_url)
+        from services.security.benchmarks.runner import (
+            compare, load_baseline, run_in_process, run_over_http, save_baseline
+        )
+
+        started = time.perf_counter()
+        state = seed_scale(args.users, args.roles, args.permissions, args.avatars, args.seed)
+        state["users"] = args.users
+        logging.info(f"Datos de prueba cargados en {time.perf_counter() - started:.1f}s")
+
+        if args.mode == "http":
+            results = run_over_http(
+                state, scenarios, args.requests, args.concurrency, args.warmup, args.seed, args.workers, args.clients
+            )
+        else:
+            results = asyncio.run(
+                run_in_process(state, scenarios, args.requests, args.concurrency, args.warmup, args.seed)
+            )
+
+    report = {
+        "meta": {
+            "database": database_url.split("://", 1)[0],
+            "mode": args.mode,
+            "users": args.users,
+            "roles": args.roles,
+            "permissions": args.permissions,
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+            "workers": args.workers if args.mode == "http" else 1,
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        },
+        "scenarios": results,
+    }
+
+    exit_code = 0
+    baseline = load_baseline(args.baseline)
+    if baseline and not args.save_baseline:
+        changed = [key for key in COMPARABLE_KEYS if baseline.get("meta", {}).get(key) != report["meta"][key]]
+        if changed:
+            logging.warning(f"La linea base se genero con otra configuracion ({', '.join(changed)})")
+        report["comparison"] = compare(report, baseline, args.tolerance)
+        regressions = [name for name, result in report["comparison"].items() if result["regression"]]
+        if regressions:
+            logging.error(f"Regresiones respecto a la linea base: {', '.join(regressions)}")
+            exit_code = 1
+    if args.save_baseline:
+        save_baseline(args.baseline, report)
+        logging.info(f"Linea base guardada en {args.baseline}")
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as file:
+            file.write(output + "\n")
+    print(output)
+    return exit_code
+
+if __name__ == "__main__":
+    sys.exit(main())
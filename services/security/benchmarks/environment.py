@@ -0,0 +1,136 @@
+from contextlib import contextmanager
+from typing import Iterator
+import hashlib
+import io
+import os
+import random
+import shutil
+import socket
+import subprocess
+import tempfile
+
+BENCH_PASSWORD = "bench-password"
+BENCH_PHONE_START = 600000000
+ADMIN_PHONE = "123456789"
+ADMIN_PASSWORD = "admin-password"
+SEED_CHUNK_SIZE = 10000
+
+BENCH_ENV = {
+    "SECRET_KEY": "bench-secret",
+    "ALGORITHM": "HS256",
+    "LOGIN_IP_BURST": "1000000000",
+    "LOGIN_IP_RATE": "1000000000",
+    "LOGIN_PHONE_BURST": "1000000000",
+    "LOGIN_PHONE_RATE": "1000000000",
+}
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+@contextmanager
+def sqlite_database() -> Iterator[str]:
+    directory = tempfile.mkdtemp(prefix="bench-sqlite-")
+    try:
+        yield f"sqlite:///{os.path.join(directory, 'bench.db')}"
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+@contextmanager
+def ephemeral_postgres() -> Iterator[str]:
+    initdb = shutil.which("initdb")
+    pg_ctl = shutil.which("pg_ctl")
+    if not initdb or not pg_ctl:
+        raise RuntimeError("Se requieren initdb y pg_ctl en el PATH para usar una base Postgres efimera")
+    directory = tempfile.mkdtemp(prefix="bench-postgres-")
+    data = os.path.join(directory, "data")
+    port = free_port()
+    subprocess.run([initdb, "-D", data, "-U", "bench", "--auth=trust", "-E", "UTF8"], check=True, capture_output=True)
+    subprocess.run([
+        pg_ctl, "-D", data, "-l", os.path.join(directory, "postgres.log"), "-w",
+        "-o", f"-p {port} -k {directory} -c listen_addresses=127.0.0.1 -c fsync=off -c synchronous_commit=off",
+        "start"
+    ], check=True, capture_output=True)
+    try:
+        yield f"postgresql://bench@127.0.0.1:{port}/postgres"
+    finally:
+        subprocess.run([pg_ctl, "-D", data, "-m", "fast", "stop"], capture_output=True)
+        shutil.rmtree(directory, ignore_errors=True)
+
+def configure(database_url: str):
+    os.environ["DB_URL"] = database_url
+    for key, value in BENCH_ENV.items():
+        os.environ.setdefault(key, value)
+
+def _avatar_file() -> str:
+    from PIL import Image
+    from services.security.utils.files import AVATARS_PATH, BASE_PATH
+
+    buffer = io.BytesIO()
+    Image.new("RGB", (512, 512), (40, 120, 200)).save(buffer, format="PNG")
+    content = buffer.getvalue()
+    relative_path = os.path.join(AVATARS_PATH, f"{hashlib.sha256(content).hexdigest()}.png")
+    os.makedirs(os.path.join(BASE_PATH, AVATARS_PATH), exist_ok=True)
+    with open(os.path.join(BASE_PATH, relative_path), "wb") as file:
+        file.write(content)
+    return relative_path
+
+def seed_scale(users: int, roles: int, permissions: int, avatars: int, seed: int = 0) -> dict:
+    from sqlalchemy import insert, select
+    from services.security.config.database import engine
+    from services.security.manage import migrate, seed as seed_base
+    from services.security.models.permission import Permission
+    from services.security.models.role import Role
+    from services.security.models.role_has_permissions import RoleHasPermissions
+    from services.security.models.user import User
+    from services.security.models.user_has_roles import UserHasRoles
+    from services.security.utils.hashing import get_context
+
+    migrate(fresh=True)
+    seed_base()
+    generator = random.Random(seed)
+    password = get_context().hash(BENCH_PASSWORD)
+    avatar = _avatar_file() if avatars else ""
+
+    with engine.begin() as connection:
+        if permissions:
+            connection.execute(insert(Permission), [
+                {"name": f"bench permiso {i}", "action": f"bench action {i}", "model": "bench"}
+                for i in range(permissions)
+            ])
+        if roles:
+            connection.execute(insert(Role), [
+                {"name": f"bench role {i}", "description": "bench"} for i in range(roles)
+            ])
+        for start in range(0, users, SEED_CHUNK_SIZE):
+            connection.execute(insert(User), [
+                {
+                    "code": f"B{i}", "name": "bench", "last_name": "bench", "second_surname": "bench",
+                    "email": f"bench{i}@bench.example.com", "phone": BENCH_PHONE_START + i, "password": password,
+                    "avatar": avatar if i < avatars else "", "token_firebase": None,
+                }
+                for i in range(start, min(users, start + SEED_CHUNK_SIZE))
+            ])
+
+        permission_ids = list(connection.scalars(select(Permission.id)))
+        role_ids = list(connection.scalars(select(Role.id).where(Role.name.like("bench role %"))))
+        user_ids = list(connection.scalars(select(User.id).where(User.email.like("%@bench.example.com")).order_by(User.id)))
+        if role_ids:
+            connection.execute(insert(RoleHasPermissions), [
+                {"role_id": role_id, "permission_id": permission_id}
+                for role_id in role_ids
+                for permission_id in generator.sample(permission_ids, min(10, len(permission_ids)))
+            ])
+            for start in range(0, len(user_ids), SEED_CHUNK_SIZE):
+                connection.execute(insert(UserHasRoles), [
+                    {"user_id": user_id, "role_id": generator.choice(role_ids)}
+                    for user_id in user_ids[start:start + SEED_CHUNK_SIZE]
+                ])
+
+    return {
+        "user_ids": user_ids,
+        "role_ids": role_ids,
+        "permission_ids": permission_ids,
+        "avatar_user_ids": user_ids[:avatars],
+    }
@@ -0,0 +1,159 @@
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from random import Random
+from typing import Dict, List
+import asyncio
+import json
+import math
+import multiprocessing
+import os
+import subprocess
+import sys
+import time
+import httpx
+from services.security.benchmarks.environment import ADMIN_PASSWORD, ADMIN_PHONE, free_port
+from services.security.benchmarks.scenarios import API, SCENARIOS
+
+SERVER_START_TIMEOUT = 60
+
+def percentile(values: List[float], fraction: float) -> float:
+    if not values:
+        return 0.0
+    return values[max(0, math.ceil(fraction * len(values)) - 1)]
+
+def summarize(latencies: List[float], statuses: Counter, elapsed: float) -> dict:
+    latencies = sorted(latencies)
+    return {
+        "requests": len(latencies),
+        "errors": sum(count for code, count in statuses.items() if code == "error" or int(code) >= 400),
+        "status_codes": dict(sorted(statuses.items())),
+        "seconds": round(elapsed, 4),
+        "throughput": round(len(latencies) / elapsed, 2) if elapsed else 0.0,
+        "p50_ms": round(percentile(latencies, 0.50) * 1000, 3),
+        "p95_ms": round(percentile(latencies, 0.95) * 1000, 3),
+        "p99_ms": round(percentile(latencies, 0.99) * 1000, 3),
+    }
+
+async def drive(client: httpx.AsyncClient, name: str, state: dict, requests: int, concurrency: int, seed: int):
+    scenario = SCENARIOS[name]
+    pending = iter(range(requests))
+    latencies: List[float] = []
+    statuses: Counter = Counter()
+
+    async def worker(rng: Random):
+        for _ in pending:
+            started = time.perf_counter()
+            try:
+                response = await scenario(client, state, rng)
+                code = str(response.status_code)
+            except httpx.HTTPError:
+                code = "error"
+            latencies.append(time.perf_counter() - started)
+            statuses[code] += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker(Random(seed + i)) for i in range(concurrency)))
+    return latencies, statuses, time.perf_counter() - started
+
+async def admin_token(client: httpx.AsyncClient) -> str:
+    response = await client.post(f"{API}/auth/login", data={"username": ADMIN_PHONE, "password": ADMIN_PASSWORD})
+    response.raise_for_status()
+    return response.json()["token"]
+
+async def run_in_process(state: dict, scenarios: List[str], requests: int, concurrency: int, warmup: int, seed: int) -> Dict[str, dict]:
+    from services.security.main import create_app
+
+    app = create_app()
+    results = {}
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            state = {**state, "token": await admin_token(client)}
+            for name in scenarios:
+                if warmup:
+                    await drive(client, name, state, warmup, concurrency, seed + requests)
+                results[name] = summarize(*await drive(client, name, state, requests, concurrency, seed))
+    return results
+
+def _load_worker(base_url: str, name: str, state: dict, requests: int, concurrency: int, seed: int):
+    async def run():
+        limits = httpx.Limits(max_connections=concurrency)
+        async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60) as client:
+            return await drive(client, name, state, requests, concurrency, seed)
+    return asyncio.run(run())
+
+def _wait_for_server(base_url: str, process: subprocess.Popen):
+    deadline = time.monotonic() + SERVER_START_TIMEOUT
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"El servidor termino con el codigo {process.returncode}")
+        try:
+            httpx.get(f"{base_url}/.well-known/jwks.json", timeout=1)
+            return
+        except httpx.HTTPError:
+            time.sleep(0.2)
+    raise RuntimeError("El servidor no respondio a tiempo")
+
+async def _admin_token_over_http(base_url: str) -> str:
+    async with httpx.AsyncClient(base_url=base_url) as client:
+        return await admin_token(client)
+
+def run_over_http(state: dict, scenarios: List[str], requests: int, concurrency: int, warmup: int, seed: int,
+                  workers: int, clients: int) -> Dict[str, dict]:
+    port = free_port()
+    base_url = f"http://127.0.0.1:{port}"
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "services.security.main:app", "--port", str(port),
+         "--workers", str(workers), "--log-level", "warning"],
+        env=os.environ.copy()
+    )
+    results = {}
+    try:
+        _wait_for_server(base_url, server)
+        state = {**state, "token": asyncio.run(_admin_token_over_http(base_url))}
+        context = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(clients, mp_context=context) as pool:
+            for name in scenarios:
+                shares = [requests // clients + (i < requests % clients) for i in range(clients)]
+                per_client = max(1, concurrency // clients)
+                if warmup:
+                    list(pool.map(_load_worker, *zip(*[
+                        (base_url, name, state, max(1, warmup // clients), per_client, seed + requests + i) for i in range(clients)
+                    ])))
+                started = time.perf_counter()
+                outcomes = list(pool.map(_load_worker, *zip(*[
+                    (base_url, name, state, share, per_client, seed + i * concurrency) for i, share in enumerate(shares)
+                ])))
+                elapsed = time.perf_counter() - started
+                latencies = [latency for outcome in outcomes for latency in outcome[0]]
+                results[name] = summarize(latencies, sum((outcome[1] for outcome in outcomes), Counter()), elapsed)
+    finally:
+        server.terminate()
+        server.wait()
+    return results
+
+def compare(report: dict, baseline: dict, tolerance: float) -> dict:
+    comparison = {}
+    for name, current in report["scenarios"].items():
+        previous = baseline.get("scenarios", {}).get(name)
+        if previous is None:
+            continue
+        p95_ratio = current["p95_ms"] / previous["p95_ms"] if previous["p95_ms"] else 1.0
+        throughput_ratio = current["throughput"] / previous["throughput"] if previous["throughput"] else 1.0
+        comparison[name] = {
+            "p95_ratio": round(p95_ratio, 3),
+            "throughput_ratio": round(throughput_ratio, 3),
+            "regression": p95_ratio > 1 + tolerance or throughput_ratio < 1 - tolerance,
+        }
+    return comparison
+
+def load_baseline(path: str) -> dict | None:
+    if not os.path.exists(path):
+        return None
+    with open(path) as file:
+        return json.load(file)
+
+def save_baseline(path: str, report: dict):
+    with open(path, "w") as file:
+        json.dump(report, file, indent=2)
+        file.write("\n")
@@ -0,0 +1,44 @@
+from random import Random
+import httpx
+from services.security.benchmarks.environment import BENCH_PASSWORD, BENCH_PHONE_START
+
+API = "/api/v1"
+
+def _headers(state: dict) -> dict:
+    return {"Authorization": f"Bearer {state['token']}"}
+
+async def login(client: httpx.AsyncClient, state: dict, rng: Random) -> httpx.Response:
+    phone = BENCH_PHONE_START + rng.randrange(state["users"])
+    return await client.post(f"{API}/auth/login", data={"username": str(phone), "password": BENCH_PASSWORD})
+
+async def list_users(client: httpx.AsyncClient, state: dict, rng: Random) -> httpx.Response:
+    page = rng.randint(1, max(1, min(state["users"] // 20, 50)))
+    return await client.get(f"{API}/users", params={"page": page, "size": 20}, headers=_headers(state))
+
+async def show_user(client: httpx.AsyncClient, state: dict, rng: Random) -> httpx.Response:
+    return await client.get(f"{API}/users/{rng.choice(state['user_ids'])}", headers=_headers(state))
+
+async def assign_roles(client: httpx.AsyncClient, state: dict, rng: Random) -> httpx.Response:
+    return await client.post(f"{API}/users/assign-roles", headers=_headers(state), json={
+        "user_id": rng.choice(state["user_ids"]),
+        "roles_ids": rng.sample(state["role_ids"], min(2, len(state["role_ids"]))),
+    })
+
+async def assign_permissions(client: httpx.AsyncClient, state: dict, rng: Random) -> httpx.Response:
+    return await client.post(f"{API}/users/assign-permissions", headers=_headers(state), json={
+        "user_id": rng.choice(state["user_ids"]),
+        "permissions_ids": rng.sample(state["permission_ids"], min(2, len(state["permission_ids"]))),
+    })
+
+async def avatar(client: httpx.AsyncClient, state: dict, rng: Random) -> httpx.Response:
+    user_id = rng.choice(state["avatar_user_ids"])
+    return await client.get(f"{API}/users/{user_id}/avatar", headers=_headers(state), follow_redirects=True)
+
+SCENARIOS = {
+    "login": login,
+    "list_users": list_users,
+    "show_user": show_user,
+    "assign_roles": assign_roles,
+    "assign_permissions": assign_permissions,
+    "avatar": avatar,
+}
@@ -1,9 +1,12 @@
 import os
 from dotenv import load_dotenv
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
 from pathlib import Path
+from uuid import uuid4
 
 env_path = Path(__file__).resolve().parent.parent / '.env'
 load_dotenv(dotenv_path=env_path)
@@ -14,11 +17,56 @@ DB_PORT = os.getenv("DB_PORT")
 DB_DATABASE = os.getenv("DB_DATABASE")
 DB_USERNAME = os.getenv("DB_USERNAME")
 DB_PASSWORD = os.getenv("DB_PASSWORD")
+DB_URL = os.getenv("DB_URL")
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE") or "5")
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW") or "10")
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT") or "30")
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE") or "-1")
+DB_POOL_PRE_PING = (os.getenv("DB_POOL_PRE_PING") or "False").lower() == "true"
+DB_POOL_WARMUP = int(os.getenv("DB_POOL_WARMUP") or str(DB_POOL_SIZE))
+DB_PGBOUNCER = (os.getenv("DB_PGBOUNCER") or "False").lower() == "true"
 
-SQLALCHEMY_DB_URL = (
-    f"{DB_CONNECTION}://{DB_USERNAME}:{DB_PASSWORD}@"
-    f"{DB_HOST}:{DB_PORT}/{DB_DATABASE}"
-)
-engine = create_engine(SQLALCHEMY_DB_URL)
+if DB_URL:
+    SQLALCHEMY_DB_URL = DB_URL
+elif DB_CONNECTION and DB_CONNECTION.startswith("sqlite"):
+    SQLALCHEMY_DB_URL = f"{DB_CONNECTION}:///{DB_DATABASE}"
+else:
+    SQLALCHEMY_DB_URL = (
+        f"{DB_CONNECTION}://{DB_USERNAME}:{DB_PASSWORD}@"
+        f"{DB_HOST}:{DB_PORT}/{DB_DATABASE}"
+    )
+ASYNC_DRIVERS = {
+    "postgresql": "postgresql+asyncpg",
+    "postgresql+psycopg2": "postgresql+asyncpg",
+    "sqlite": "sqlite+aiosqlite",
+}
+DB_SCHEME, DB_LOCATION = SQLALCHEMY_DB_URL.split("://", 1)
+DB_ASYNC_CONNECTION = os.getenv("DB_ASYNC_CONNECTION") or ASYNC_DRIVERS.get(DB_SCHEME, DB_SCHEME)
+
+SQLALCHEMY_ASYNC_DB_URL = f"{DB_ASYNC_CONNECTION}://{DB_LOCATION}"
+
+def engine_options(url: str) -> dict:
+    if DB_PGBOUNCER:
+        options = {"poolclass": NullPool}
+        if url.startswith("postgresql+asyncpg"):
+            options["connect_args"] = {
+                "statement_cache_size": 0,
+                "prepared_statement_cache_size": 0,
+                "prepared_statement_name_func": lambda: f"__asyncpg_{uuid4()}__",
+            }
+        return options
+    if ":memory:" in url:
+        return {}
+    return {
+        "pool_size": DB_POOL_SIZE,
+        "max_overflow": DB_MAX_OVERFLOW,
+        "pool_timeout": DB_POOL_TIMEOUT,
+        "pool_recycle": DB_POOL_RECYCLE,
+        "pool_pre_ping": DB_POOL_PRE_PING,
+    }
+
+engine = create_engine(SQLALCHEMY_DB_URL, **engine_options(SQLALCHEMY_DB_URL))
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+async_engine = create_async_engine(SQLALCHEMY_ASYNC_DB_URL, **engine_options(SQLALCHEMY_ASYNC_DB_URL))
+AsyncSessionLocal = async_sessionmaker(bind=async_engine, autoflush=False, expire_on_commit=False)
 Base = declarative_base()
\ No newline at end of file
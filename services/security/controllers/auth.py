@@ -1,60 +1,79 @@
-import jwt.exceptions
 from dotenv import load_dotenv
-from fastapi import Depends, HTTPException, status, APIRouter
-from fastapi.responses import FileResponse
+from fastapi import Depends, HTTPException, status, APIRouter, Security, Request
+from fastapi.responses import ORJSONResponse
 from fastapi.security import OAuth2PasswordRequestForm
-from passlib.context import CryptContext
 from datetime import timedelta, datetime
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.ext.asyncio import AsyncSession
 from services.security.models.user import User
-from services.security.schemas.auth import Token, TokenData
+from services.security.schemas.auth import Token, TokenIntrospect
 from services.security.schemas.user import UserResponse
 from services.security.utils.dependency import get_db
-import os
-import jwt
+from services.security.utils.hashing import verify_password
+from services.security.utils.role_permissions import resolve_user_permissions
+from services.security.utils.scopes import ScopeRegistry, encode_mask, get_scope_registry, scopes_to_mask
+from services.security.utils.tokens import encode_token
+from services.security.utils.introspection import introspect_tokens
+from services.security.utils.rate_limit import check_login, client_ip, record_login_failure, record_login_success
+from services.security.utils.security import get_current_user
+import time
 router = APIRouter()
 
 load_dotenv()
 
-SECRET_KEY = os.getenv("SECRET_KEY")
-ALGORITHM = os.getenv("ALGORITHM")
 ACCESS_TOKEN_EXPIRE = timedelta(minutes=60)
 
-bcrypt_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
-
 @router.post("/auth/login", status_code=status.HTTP_200_OK, response_model=Token)
-def login(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)) -> Token:
-    user = db.query(User).filter(User.phone == form_data.username).first()
+async def login(request: Request, form_data: OAuth2PasswordRequestForm = Depends(), db: AsyncSession = Depends(get_db)) -> Token:
+    address = client_ip(request)
+    check_login(address, form_data.username)
+    user = await db.scalar(select(User).where(User.phone == form_data.username))
     if not user:
+        record_login_failure(address, form_data.username)
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="El numero de celular o contraseña estan incorrectas"
         )
     try:
-        if not verify_password(form_data.password, user.password):
+        if not await verify_password(form_data.password, user.password):
+            record_login_failure(address, form_data.username)
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="El numero de celular o contraseña estan incorrectas"
             )
-        roles = [role.name for role in user.roles]
-        permissions = [permission.action for permission in user.permissions]
-        token = create_access_token(user.phone, ACCESS_TOKEN_EXPIRE, user.id, permissions, roles)
+        record_login_success(address, form_data.username)
+        roles, permissions = await resolve_user_permissions(user.id, db)
+        registry = await get_scope_registry(db)
+        token = create_access_token(user.phone, ACCESS_TOKEN_EXPIRE, user.id, permissions, roles, registry)
         return {
             'token': token,
             'token_type': 'bearer',
             'user': UserResponse.model_validate(user),
         }
+    except (HTTPException, PoolTimeoutError):
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Error al verificar las credenciales {e}"
         )
 
-def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return bcrypt_context.verify(plain_password, hashed_password)
+@router.post("/auth/introspect", status_code=status.HTTP_200_OK)
+async def introspect(
+        token_introspect: TokenIntrospect,
+        db: AsyncSession = Depends(get_db),
+        user_permission: User = Security(get_current_user, scopes=["introspect tokens"])
+):
+    return ORJSONResponse({
+        "message": "Se han verificado los tokens correctamente",
+        "data": await introspect_tokens(token_introspect.tokens, token_introspect.scopes, db)
+    })
 
-def create_access_token(username: int, expires_delta: timedelta,  user_id: int, scopes: list[str], roles: list[str]):
-    encode = {'sub': str(username), 'id': user_id, 'scopes': scopes, 'roles': roles}
-    expires = datetime.utcnow() + expires_delta
-    encode.update({'exp': expires})
-    return jwt.encode(encode, SECRET_KEY, algorithm=ALGORITHM)
\ No newline at end of file
+def create_access_token(username: int, expires_delta: timedelta,  user_id: int, scopes: list[str], roles: list[str], registry: ScopeRegistry):
+    encode = {
+        'sub': str(username), 'id': user_id, 'roles': roles,
+        'perms': encode_mask(scopes_to_mask(scopes, registry)), 'sv': registry.version
+    }
+    encode.update({'iat': time.time(), 'exp': datetime.utcnow() + expires_delta})
+    return encode_token(encode)
\ No newline at end of file
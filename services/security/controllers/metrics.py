@@ -0,0 +1,13 @@
+from fastapi import APIRouter, status
+from fastapi.responses import PlainTextResponse
+from services.security.utils.metrics import render
+
+router = APIRouter()
+
+@router.get(
+    "/metrics",
+    status_code=status.HTTP_200_OK,
+    include_in_schema=False
+)
+async def metrics():
+    return PlainTextResponse(render(), media_type="text/plain; version=0.0.4")
@@ -0,0 +1,38 @@
+from fastapi import APIRouter, HTTPException, status, Security
+from fastapi.responses import FileResponse, ORJSONResponse
+from starlette.concurrency import run_in_threadpool
+from services.security.models.user import User
+from services.security.utils.profiler import list_profiles, profile_path
+from services.security.utils.security import get_current_user
+
+router = APIRouter()
+
+@router.get(
+    "/profiles",
+    status_code=status.HTTP_200_OK,
+    tags=["profiles"]
+)
+async def list(
+        user_permission: User = Security(get_current_user, scopes=["view profiles"])
+):
+    return ORJSONResponse({
+        "message": "Se ha obtenido la lista de perfiles correctamente",
+        "data": await run_in_threadpool(list_profiles)
+    })
+
+@router.get(
+    "/profiles/{name}",
+    status_code=status.HTTP_200_OK,
+    tags=["profiles"]
+)
+async def show(
+        name: str,
+        user_permission: User = Security(get_current_user, scopes=["view profiles"])
+):
+    path = profile_path(name)
+    if path is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="No existe el perfil que desea obtener"
+        )
+    return FileResponse(path, media_type="text/plain", filename=name)
@@ -1,13 +1,24 @@
 from fastapi import APIRouter, Depends, HTTPException, Query, status, Security
+from fastapi.responses import ORJSONResponse
 from fastapi_pagination import Params
-from sqlalchemy.orm import Session
-from fastapi_pagination.ext.sqlalchemy import  paginate
+from sqlalchemy import select
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.ext.asyncio import AsyncSession
+from fastapi_pagination.ext.sqlalchemy import apaginate
 from services.security.models.permission import Permission
 from services.security.models.user import User
 from services.security.utils.dependency import  get_db
 from services.security.models.role import Role
-from services.security.schemas.roles import RoleStore, RoleUpdate, RoleUsers, RolePermissions, RoleResponse
+from services.security.models.role_has_permissions import RoleHasPermissions
+from services.security.models.user_has_roles import UserHasRoles
+from services.security.schemas.roles import RoleStore, RoleUpdate, RoleUsers, RolePermissions, RoleResponse, RoleBatch
 from services.security.utils.security import get_current_user
+from services.security.utils.role_permissions import invalidate_role_permissions
+from services.security.utils.pagination import decode_cursor, keyset_paginate
+from services.security.utils.assignments import assign_links
+from services.security.utils.serialization import projection, row_to_dict, rows_to_dicts
+from services.security.utils.batch import fetch_by_ids, parse_ids, unique_ids
+from services.security.utils.cache import get_cached, set_cached, invalidate, invalidate_all
 
 router = APIRouter()
 
@@ -16,22 +27,55 @@ router = APIRouter()
     status_code=status.HTTP_200_OK,
     tags=["roles"]
 )
-def list(
+async def list(
         page: int = Query(1, ge=1, description="Numero de pagina"),
         size: int = Query(10, ge=1, le=100, description="Roles por pagina"),
-        db: Session = Depends(get_db),
+        after: str | None = Query(None, description="Cursor de la pagina anterior (paginacion por cursor)"),
+        include_total: bool = Query(False, description="Incluir el total en la paginacion por cursor"),
+        ids: str | None = Query(None, description="Ids separados por comas para obtener varios roles a la vez"),
+        db: AsyncSession = Depends(get_db),
         role_permission: Role = Security(get_current_user, scopes=["view roles"])
 ):
+    after_id = decode_cursor(after) if after is not None else None
+    requested_ids = unique_ids(parse_ids(ids)) if ids is not None else None
     try:
+        if requested_ids is not None:
+            return ORJSONResponse({
+                "message": "Se ha obtenido la lista de roles correctamente",
+                **await fetch_by_ids(db, Role, RoleResponse, "role", requested_ids)
+            })
+
+        if after is not None:
+            items, next_cursor, total = await keyset_paginate(
+                db, Role, after_id, size, include_total, projection(Role, RoleResponse)
+            )
+            total_query = "&include_total=true" if include_total else ""
+            return ORJSONResponse({
+                "message": "Se ha obtenido la lista de roles correctamente",
+                "data": rows_to_dicts(RoleResponse, items),
+                "total": total,
+                "page": None,
+                "size": size,
+                "links": {
+                    "next": f"/api/v1/roles?after={next_cursor}&size={size}{total_query}" if next_cursor else None,
+                    "previous": None,
+                    "first": f"/api/v1/roles?after=&size={size}{total_query}",
+                    "last": None
+                }
+            })
+
         params = Params(page=page, size=size)
-        response = paginate(db.query(Role), params)
+        response = await apaginate(
+            db, select(*projection(Role, RoleResponse)).order_by(Role.id), params,
+            unwrap_mode="no-unwrap", transformer=lambda rows: rows_to_dicts(RoleResponse, rows)
+        )
 
         next_page = page + 1 if page * size < response.total else None
         prev_page = page - 1 if page > 1 else None
 
-        return {
+        return ORJSONResponse({
             "message": "Se ha obtenido la lista de roles correctamente",
-            "data": [RoleResponse.model_validate(role) for role in response.items],
+            "data": response.items,
             "total": response.total,
             "page": response.page,
             "size": response.size,
@@ -41,7 +85,9 @@ def list(
                 "first": f"/api/v1/roles?page=1&size={size}",
                 "last": f"/api/v1/roles?page={response.pages}&size={size}"
             }
-        }
+        })
+    except PoolTimeoutError:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -52,52 +98,88 @@ def list(
     status_code=status.HTTP_201_CREATED,
     tags=["roles"]
 )
-def store(
+async def store(
         role_store: RoleStore,
-        db: Session = Depends(get_db),
+        db: AsyncSession = Depends(get_db),
         role_permission: Role = Security(get_current_user, scopes=["create roles"])
 ):
     try:
         new_role = Role(**role_store.model_dump())
         db.add(new_role)
-        db.commit()
-        db.refresh(new_role)
+        await db.commit()
+        await db.refresh(new_role)
 
         return {
             "message": "Se ha registrado el rol correctamente",
             "data": RoleResponse.model_validate(new_role)
         }
+    except PoolTimeoutError:
+        raise
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Error al registrar el rol {e}"
         )
 
+@router.post(
+    "/roles/batch",
+    status_code=status.HTTP_200_OK,
+    tags=["roles"]
+)
+async def batch(
+        role_batch: RoleBatch,
+        db: AsyncSession = Depends(get_db),
+        role_permission: Role = Security(get_current_user, scopes=["view roles"])
+):
+    requested_ids = unique_ids(role_batch.ids)
+    try:
+        return ORJSONResponse({
+            "message": "Se ha obtenido la lista de roles correctamente",
+            **await fetch_by_ids(db, Role, RoleResponse, "role", requested_ids)
+        })
+    except PoolTimeoutError:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error al obtener la lista de roles: {str(e)}"
+        )
+
 @router.get(
     "/roles/{id}",
     status_code=status.HTTP_200_OK,
     tags=["roles"]
 )
-def show(
+async def show(
         id: int,
-        db: Session = Depends(get_db),
+        db: AsyncSession = Depends(get_db),
         role_permission: Role = Security(get_current_user, scopes=["show role"])
 ):
+    cached = get_cached("role", id)
+    if cached is not None:
+        return ORJSONResponse({
+            "message": "Se ha obtenido el rol correctamente",
+            "data": cached
+        })
     try:
-        role = db.query(Role).filter(Role.id == id).first()
-        if role is None:
+        row = (await db.execute(select(*projection(Role, RoleResponse)).where(Role.id == id))).first()
+        data = row_to_dict(RoleResponse, row)
+        if data is None:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="No existe el rol con que desea obtener"
             )
 
-        return {
+        set_cached("role", id, data)
+        return ORJSONResponse({
             "message": "Se ha obtenido el rol correctamente",
-            "data": RoleResponse.model_validate(role)
-        }
+            "data": data
+        })
+    except PoolTimeoutError:
+        raise
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(
             status_code=status.HTTP_409_CONFLICT,
             detail=f"Error al obtener el rol: {e}"
@@ -108,14 +190,14 @@ def show(
     status_code=status.HTTP_200_OK,
     tags=["roles"]
 )
-def update(
+async def update(
         id: int ,
         role_update: RoleUpdate,
-        db: Session = Depends(get_db),
+        db: AsyncSession = Depends(get_db),
         role_permission: Role = Security(get_current_user, scopes=["update roles"])
 ):
     try:
-        current_role = db.query(Role).filter(Role.id == id).first()
+        current_role = await db.scalar(select(Role).where(Role.id == id))
         role_update.id = id
         if current_role is None:
             raise HTTPException(
@@ -124,14 +206,18 @@ def update(
             )
         for key, value in role_update.model_dump(exclude_unset=True).items():
             setattr(current_role, key, value)
-        db.commit()
-        db.refresh(current_role)
+        await db.commit()
+        invalidate_role_permissions()
+        invalidate("role", id)
+        await db.refresh(current_role)
         return {
             "message": "Se ha actualizado el rol correctamente",
             "data": RoleResponse.model_validate(current_role)
         }
+    except PoolTimeoutError:
+        raise
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(
             status_code=status.HTTP_409_CONFLICT,
             detail=f"Error al actualizar el rol: {e}"
@@ -142,25 +228,30 @@ def update(
     status_code=status.HTTP_200_OK,
     tags=["roles"]
 )
-def destroy(
+async def destroy(
         id: int,
-        db: Session = Depends(get_db),
+        db: AsyncSession = Depends(get_db),
         role_permission: Role = Security(get_current_user, scopes=["delete roles"])
 ):
     try:
-        role = db.query(Role).filter(Role.id == id).first()
+        role = await db.scalar(select(Role).where(Role.id == id))
         if role is None:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="No existe el rol que desea eliminar"
             )
-        db.delete(role)
-        db.commit()
+        await db.delete(role)
+        await db.commit()
+        invalidate_role_permissions()
+        invalidate_all("role")
+        invalidate_all("user")
         return {
             "message": "Se ha eliminado el rol correctamente"
         }
+    except PoolTimeoutError:
+        raise
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(
             status_code=status.HTTP_409_CONFLICT,
             detail=f"Error al eliminar el rol: {e}"
@@ -171,28 +262,31 @@ def destroy(
     status_code=status.HTTP_201_CREATED,
     tags=["roles"]
 )
-def assign_users(
+async def assign_users(
         role_users: RoleUsers,
-        db: Session = Depends(get_db),
+        db: AsyncSession = Depends(get_db),
         role_permission: Role = Security(get_current_user, scopes=["assign roles"])
 ):
     try:
-        current_role = db.query(Role).filter(Role.id == role_users.role_id).first()
+        current_role = await db.scalar(select(Role.id).where(Role.id == role_users.role_id))
         if current_role is None:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="No existe el rol que desea asignar a los usuarios"
             )
-        for id in role_users.users_ids:
-            current_user = db.query(User).filter(User.id == id).first()
-            if current_user is not None and current_user not in current_role.users:
-                current_role.users.append(current_user)
-                db.commit()
+        result = await assign_links(
+            db, UserHasRoles, "role_id", role_users.role_id, "user_id", User, role_users.users_ids
+        )
+        invalidate("role", role_users.role_id)
+        invalidate("user", *role_users.users_ids)
         return {
             "message": "Se ha asignado el rol a los usuarios correctamente",
+            "data": result
         }
+    except PoolTimeoutError:
+        raise
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(
             status_code=status.HTTP_409_CONFLICT,
             detail=f"Error al asignar el rol a los usuarios {e}"
@@ -202,28 +296,32 @@ def assign_users(
     status_code=status.HTTP_201_CREATED,
     tags=["roles"]
 )
-def assign_permissions(
+async def assign_permissions(
         role_permissions: RolePermissions,
-        db: Session = Depends(get_db),
+        db: AsyncSession = Depends(get_db),
         role_permission: Role = Security(get_current_user, scopes=["assign permissions"])
 ):
     try:
-        current_role = db.query(Role).filter(Role.id == role_permissions.role_id).first()
+        current_role = await db.scalar(select(Role.id).where(Role.id == role_permissions.role_id))
         if current_role is None:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="No existe el rol que desea asignar los permisos"
             )
-        for id in role_permissions.permissions_ids:
-            current_permission = db.query(Permission).filter(Permission.id == id).first()
-            if current_permission is not None and current_permission not in current_role.permissions:
-                current_role.permissions.append(current_permission)
-                db.commit()
+        result = await assign_links(
+            db, RoleHasPermissions, "role_id", role_permissions.role_id, "permission_id", Permission,
+            role_permissions.permissions_ids
+        )
+        invalidate_role_permissions()
+        invalidate("role", role_permissions.role_id)
         return {
             "message": "Se ha asignado los permisos al rol correctamente",
+            "data": result
         }
+    except PoolTimeoutError:
+        raise
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(
             status_code=status.HTTP_409_CONFLICT,
             detail=f"Error al asignar los permisos al rol {e}"
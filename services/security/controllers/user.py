@@ -1,43 +1,98 @@
-from fastapi import APIRouter, Depends, HTTPException, Query, status, Security, Form, UploadFile, File
+from fastapi import (
+    APIRouter, Depends, HTTPException, Query, status, Security, Form, UploadFile, File, Request, Header, BackgroundTasks
+)
 from fastapi_pagination import Params
-from fastapi.responses import FileResponse
-from fastapi_pagination.ext.sqlalchemy import paginate
-from passlib.context import CryptContext
-from pydantic import EmailStr
-from sqlalchemy.orm import Session
+from fastapi.responses import FileResponse, StreamingResponse, RedirectResponse, Response, ORJSONResponse
+from fastapi_pagination.ext.sqlalchemy import apaginate
+from pydantic import EmailStr, ValidationError
+from sqlalchemy import select
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.concurrency import run_in_threadpool
 from services.security.models.permission import Permission
 from services.security.models.role import Role
 from services.security.models.status_enum import StatusEnum
-from services.security.schemas.user import UserRoles, UserPermissions, UserResponse
+from services.security.models.user_has_permissions import UserHasPermissions
+from services.security.models.user_has_roles import UserHasRoles
+from services.security.schemas.user import UserRoles, UserPermissions, UserResponse, UserImport, UserBatch
+from services.security.config.database import AsyncSessionLocal
 from services.security.utils.dependency import  get_db
 from services.security.models.user import User
 from services.security.utils.security import get_current_user
-from services.security.utils.files import save_avatar_file
+from services.security.utils.files import (
+    save_avatar_file, publish_avatar_file, discard_avatar_file, avatar_lock, remove_avatar_if_unused,
+    avatar_etag, avatar_media_type, avatar_path, AVATAR_REDIRECT_MAX_AGE, BASE_PATH, CONTENT_ADDRESSED, AVATARS_PATH
+)
+from services.security.utils.hashing import hash_password, hash_many
+from services.security.utils.thumbnails import (
+    THUMBNAIL_NAME, THUMBNAIL_SIZES, ensure_thumbnail, generate_thumbnails, thumbnail_name
+)
+from services.security.utils.pagination import decode_cursor, keyset_paginate
+from services.security.utils.assignments import assign_links, insert_ignore
+from services.security.utils.user_import import detect_format, iter_file, iter_records, spool_body
+from services.security.utils.tokens import revoke_user
+from services.security.utils.serialization import projection, row_to_dict, rows_to_dicts
+from services.security.utils.batch import fetch_by_ids, parse_ids, unique_ids
+from services.security.utils.cache import get_cached, set_cached, invalidate, invalidate_all
+from typing import AsyncIterator
+import json
 import os
 router = APIRouter()
-bcrypt_context = CryptContext(schemes=['bcrypt'], deprecated='auto')
 
 @router.get(
     "/users",
     status_code=status.HTTP_200_OK,
     tags=["users"]
 )
-def list(
+async def list(
         page: int = Query(1, ge=1, description="Numero de pagina"),
         size: int = Query(10, ge=1, le=100, description="Usuarios por pagina"),
-        db: Session = Depends(get_db),
+        after: str | None = Query(None, description="Cursor de la pagina anterior (paginacion por cursor)"),
+        include_total: bool = Query(False, description="Incluir el total en la paginacion por cursor"),
+        ids: str | None = Query(None, description="Ids separados por comas para obtener varios usuarios a la vez"),
+        db: AsyncSession = Depends(get_db),
         user_permission: User = Security(get_current_user, scopes=["view users"])
 ):
+    after_id = decode_cursor(after) if after is not None else None
+    requested_ids = unique_ids(parse_ids(ids)) if ids is not None else None
     try:
+        if requested_ids is not None:
+            return ORJSONResponse({
+                "message": "Se ha obtenido la lista de usuarios correctamente",
+                **await fetch_by_ids(db, User, UserResponse, "user", requested_ids)
+            })
+
+        if after is not None:
+            items, next_cursor, total = await keyset_paginate(
+                db, User, after_id, size, include_total, projection(User, UserResponse)
+            )
+            total_query = "&include_total=true" if include_total else ""
+            return ORJSONResponse({
+                "message": "Se ha obtenido la lista de usuarios correctamente",
+                "data": rows_to_dicts(UserResponse, items),
+                "total": total,
+                "page": None,
+                "size": size,
+                "links": {
+                    "next": f"/api/v1/users?after={next_cursor}&size={size}{total_query}" if next_cursor else None,
+                    "previous": None,
+                    "first": f"/api/v1/users?after=&size={size}{total_query}",
+                    "last": None
+                }
+            })
+
         params = Params(page=page, size=size)
-        response = paginate(db.query(User), params)
+        response = await apaginate(
+            db, select(*projection(User, UserResponse)).order_by(User.id), params,
+            unwrap_mode="no-unwrap", transformer=lambda rows: rows_to_dicts(UserResponse, rows)
+        )
 
         next_page = page + 1 if page * size < response.total else None
         prev_page = page - 1 if page > 1 else None
 
-        return {
+        return ORJSONResponse({
             "message": "Se ha obtenido la lista de usuarios correctamente",
-            "data": [UserResponse.model_validate(user) for user in response.items],
+            "data": response.items,
             "total": response.total,
             "page": response.page,
             "size": response.size,
@@ -47,7 +102,9 @@ def list(
                 "first": f"/api/v1/users?page=1&size={size}",
                 "last": f"/api/v1/users?page={response.pages}&size={size}"
             }
-        }
+        })
+    except PoolTimeoutError:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -58,7 +115,7 @@ def list(
     status_code=status.HTTP_201_CREATED,
     tags=["users"]
 )
-def store(
+async def store(
         code: str = Form(...),
         name: str = Form(...),
         last_name: str = Form(...),
@@ -69,16 +126,15 @@ def store(
         token_firebase: str = Form(None),
         user_status: StatusEnum = Form(...),
         avatar: UploadFile = File(...),
-        db: Session = Depends(get_db),
+        background_tasks: BackgroundTasks = None,
+        db: AsyncSession = Depends(get_db),
         user_permission: User = Security(get_current_user, scopes=["create users"])
 ):
-    saved_avatar_path = None
+    temporary_avatar_path = None
+    hashed_password = await hash_password(password)
 
     try:
-        relative_avatar_path = save_avatar_file(avatar, name, last_name, code)
-        saved_avatar_path = os.path.join("services", "security", relative_avatar_path)
-
-        hashed_password = bcrypt_context.hash(password)
+        relative_avatar_path, temporary_avatar_path = await save_avatar_file(avatar)
 
         new_user = User(
             code=code,
@@ -94,46 +150,163 @@ def store(
         )
 
         db.add(new_user)
-        db.commit()
-        db.refresh(new_user)
+        async with avatar_lock(relative_avatar_path):
+            await db.commit()
+            created = publish_avatar_file(relative_avatar_path, temporary_avatar_path)
+        temporary_avatar_path = None
+        await db.refresh(new_user)
+        if created:
+            background_tasks.add_task(generate_thumbnails, relative_avatar_path)
 
         return {
             "message": "Se ha registrado el usuario correctamente",
             "data": UserResponse.model_validate(new_user)
         }
 
+    except (HTTPException, PoolTimeoutError):
+        await db.rollback()
+        discard_avatar_file(temporary_avatar_path)
+        raise
     except Exception as e:
-        db.rollback()
-        if saved_avatar_path and os.path.exists(saved_avatar_path):
-            os.remove(saved_avatar_path)
+        await db.rollback()
+        discard_avatar_file(temporary_avatar_path)
         raise HTTPException(
             status_code=status.HTTP_409_CONFLICT,
             detail=f"Error al registrar el usuario: {e}"
         )
+@router.post(
+    "/users/import",
+    status_code=status.HTTP_200_OK,
+    tags=["users"]
+)
+async def import_users(
+        request: Request,
+        batch_size: int = Query(500, ge=1, le=5000, description="Usuarios por lote"),
+        user_permission: User = Security(get_current_user, scopes=["create users"])
+):
+    file_format = detect_format(request.headers.get("content-type", ""))
+    if file_format is None:
+        raise HTTPException(
+            status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+            detail="El archivo debe ser CSV (text/csv) o NDJSON (application/x-ndjson)"
+        )
+    body = await spool_body(request)
+    return StreamingResponse(
+        _import_users(iter_file(body), file_format, batch_size),
+        media_type="application/x-ndjson"
+    )
+
+async def _import_users(stream: AsyncIterator[bytes], file_format: str, batch_size: int):
+    summary = {"created": 0, "skipped": 0, "errors": 0}
+    batch = []
+    async with AsyncSessionLocal() as db:
+        async for line_number, record, error in iter_records(stream, file_format):
+            if error is None:
+                try:
+                    batch.append((line_number, UserImport.model_validate(record)))
+                except ValidationError as e:
+                    error = "; ".join(
+                        f"{'.'.join(str(loc) for loc in err['loc'])}: {err['msg']}" for err in e.errors()
+                    )
+            if error is not None:
+                summary["errors"] += 1
+                yield json.dumps({"line": line_number, "status": "error", "detail": error}) + "\n"
+            if len(batch) >= batch_size:
+                for result in await _insert_import_batch(db, batch, summary):
+                    yield json.dumps(result) + "\n"
+                batch = []
+        if batch:
+            for result in await _insert_import_batch(db, batch, summary):
+                yield json.dumps(result) + "\n"
+    yield json.dumps({"summary": summary}) + "\n"
+
+async def _insert_import_batch(db: AsyncSession, batch: list, summary: dict) -> list:
+    try:
+        hashed_passwords = await hash_many([user.password for _, user in batch])
+        rows = [
+            dict(user.model_dump(), password=hashed_password, avatar="", token_firebase=user.token_firebase or "")
+            for (_, user), hashed_password in zip(batch, hashed_passwords)
+        ]
+        result = await db.execute(insert_ignore(db, User).returning(User.id, User.email), rows)
+        created = {email: user_id for user_id, email in result.all()}
+        await db.commit()
+    except Exception as e:
+        await db.rollback()
+        summary["errors"] += len(batch)
+        return [
+            {"line": line_number, "status": "error", "detail": f"Error al registrar el lote: {e}"}
+            for line_number, _ in batch
+        ]
+
+    results = []
+    for line_number, user in batch:
+        user_id = created.pop(user.email, None)
+        if user_id is None:
+            summary["skipped"] += 1
+            results.append({"line": line_number, "status": "skipped", "detail": "El usuario ya existe"})
+        else:
+            summary["created"] += 1
+            results.append({"line": line_number, "status": "created", "id": user_id})
+    return results
+
+@router.post(
+    "/users/batch",
+    status_code=status.HTTP_200_OK,
+    tags=["users"]
+)
+async def batch(
+        user_batch: UserBatch,
+        db: AsyncSession = Depends(get_db),
+        user_permission: User = Security(get_current_user, scopes=["view users"])
+):
+    requested_ids = unique_ids(user_batch.ids)
+    try:
+        return ORJSONResponse({
+            "message": "Se ha obtenido la lista de usuarios correctamente",
+            **await fetch_by_ids(db, User, UserResponse, "user", requested_ids)
+        })
+    except PoolTimeoutError:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error al obtener la lista de usuarios: {str(e)}"
+        )
+
 @router.get(
     "/users/{id}",
     status_code=status.HTTP_200_OK,
     tags=["users"]
 )
-def show(
+async def show(
         id: int,
-        db: Session = Depends(get_db),
+        db: AsyncSession = Depends(get_db),
         user_permission: User = Security(get_current_user, scopes=["show user"])
 ):
+    cached = get_cached("user", id)
+    if cached is not None:
+        return ORJSONResponse({
+            "message": "Se ha obtenido el usuario correctamente",
+            "data": cached
+        })
     try:
-        user = db.query(User).filter(User.id == id).first()
-        if user is None:
+        row = (await db.execute(select(*projection(User, UserResponse)).where(User.id == id))).first()
+        data = row_to_dict(UserResponse, row)
+        if data is None:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="No existe el usuario con que desea obtener"
             )
 
-        return {
+        set_cached("user", id, data)
+        return ORJSONResponse({
             "message": "Se ha obtenido el usuario correctamente",
-            "data": UserResponse.model_validate(user)
-        }
+            "data": data
+        })
+    except PoolTimeoutError:
+        raise
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(
             status_code=status.HTTP_409_CONFLICT,
             detail=f"Error al obtener el usuario: {e}"
@@ -145,7 +318,7 @@ def show(
     status_code=status.HTTP_200_OK,
     tags=["users"]
 )
-def update(
+async def update(
         id: int,
         code: str = Form(...),
         name: str = Form(...),
@@ -157,27 +330,26 @@ def update(
         token_firebase: str = Form(None),
         user_status: StatusEnum = Form(...),
         avatar: UploadFile = File(None),
-        db: Session = Depends(get_db),
+        background_tasks: BackgroundTasks = None,
+        db: AsyncSession = Depends(get_db),
         user_permission: User = Security(get_current_user, scopes=["update users"])
 ):
-    new_avatar_path = None
+    temporary_avatar_path = None
+    hashed_password = await hash_password(password) if password else None
 
     try:
-        current_user = db.query(User).filter(User.id == id).first()
+        current_user = await db.scalar(select(User).where(User.id == id))
         if current_user is None:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="No existe el usuario que desea actualizar"
             )
 
+        old_relative_avatar_path = None
         if avatar:
-            new_relative_avatar_path = save_avatar_file(avatar, name, last_name, code)
-            new_avatar_path = os.path.join("services", "security", new_relative_avatar_path)
-
-            old_avatar_path = os.path.join("services", "security", current_user.avatar)
-            if os.path.exists(old_avatar_path) and old_avatar_path != new_avatar_path:
-                os.remove(old_avatar_path)
-
+            new_relative_avatar_path, temporary_avatar_path = await save_avatar_file(avatar)
+            if current_user.avatar != new_relative_avatar_path:
+                old_relative_avatar_path = current_user.avatar
             current_user.avatar = new_relative_avatar_path
 
         # Update other fields
@@ -190,21 +362,36 @@ def update(
         current_user.phone = phone
         current_user.token_firebase = token_firebase or current_user.token_firebase
 
-        if password:
-            current_user.password = bcrypt_context.hash(password)
+        if hashed_password:
+            current_user.password = hashed_password
 
-        db.commit()
-        db.refresh(current_user)
+        created = False
+        if temporary_avatar_path:
+            async with avatar_lock(current_user.avatar):
+                await db.commit()
+                created = publish_avatar_file(current_user.avatar, temporary_avatar_path)
+            temporary_avatar_path = None
+        else:
+            await db.commit()
+        invalidate("user", id)
+        invalidate("avatar", id)
+        await db.refresh(current_user)
+        await remove_avatar_if_unused(db, old_relative_avatar_path)
+        if created:
+            background_tasks.add_task(generate_thumbnails, current_user.avatar)
 
         return {
             "message": "Se ha actualizado el usuario correctamente",
             "data": UserResponse.model_validate(current_user)
         }
 
+    except (HTTPException, PoolTimeoutError):
+        await db.rollback()
+        discard_avatar_file(temporary_avatar_path)
+        raise
     except Exception as e:
-        db.rollback()
-        if new_avatar_path and os.path.exists(new_avatar_path):
-            os.remove(new_avatar_path)
+        await db.rollback()
+        discard_avatar_file(temporary_avatar_path)
         raise HTTPException(
             status_code=status.HTTP_409_CONFLICT,
             detail=f"Error al actualizar el usuario: {e}"
@@ -214,28 +401,32 @@ def update(
     status_code=status.HTTP_200_OK,
     tags=["users"]
 )
-def destroy(
+async def destroy(
         id: int,
-        db: Session = Depends(get_db),
+        db: AsyncSession = Depends(get_db),
         user_permission: User = Security(get_current_user, scopes=["delete users"])
 ):
     try:
-        user = db.query(User).filter(User.id == id).first()
+        user = await db.scalar(select(User).where(User.id == id))
         if user is None:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="No existe el usuario que desea eliminar"
             )
-        db.delete(user)
-        db.commit()
-        avatar_path = os.path.join("services", "security", user.avatar)
-        if os.path.exists(avatar_path):
-            os.remove(avatar_path)
+        await db.delete(user)
+        await db.commit()
+        revoke_user(id)
+        invalidate_all("user")
+        invalidate_all("role")
+        invalidate("avatar", id)
+        await remove_avatar_if_unused(db, user.avatar)
         return {
             "message": "Se ha eliminado el usuario correctamente"
         }
+    except PoolTimeoutError:
+        raise
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(
             status_code=status.HTTP_409_CONFLICT,
             detail=f"Error al eliminar el usuario: {e}"
@@ -246,28 +437,31 @@ def destroy(
     status_code=status.HTTP_201_CREATED,
     tags=["users"]
 )
-def assign_roles(
+async def assign_roles(
         user_roles:UserRoles,
-        db: Session = Depends(get_db),
+        db: AsyncSession = Depends(get_db),
         user_permission: User = Security(get_current_user, scopes=["assign roles"])
 ):
     try:
-        current_user = db.query(User).filter(User.id == user_roles.user_id).first()
+        current_user = await db.scalar(select(User.id).where(User.id == user_roles.user_id))
         if current_user is None:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="No existe el usuario que desea asignar los roles"
             )
-        for id in user_roles.roles_ids:
-            current_role = db.query(Role).filter(Role.id == id).first()
-            if current_role is not None and current_role not in current_user.roles:
-                current_user.roles.append(current_role)
-                db.commit()
+        result = await assign_links(
+            db, UserHasRoles, "user_id", user_roles.user_id, "role_id", Role, user_roles.roles_ids
+        )
+        invalidate("user", user_roles.user_id)
+        invalidate("role", *user_roles.roles_ids)
         return {
             "message": "Se ha asignado los roles al usuario correctamente",
+            "data": result
         }
+    except PoolTimeoutError:
+        raise
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(
             status_code=status.HTTP_409_CONFLICT,
             detail=f"Error al asignar los roles al usuario: {e}"
@@ -278,29 +472,31 @@ def assign_roles(
     status_code=status.HTTP_201_CREATED,
     tags=["users"]
 )
-def assign_permissions(
+async def assign_permissions(
         user_permissions: UserPermissions,
-        db: Session = Depends(get_db),
+        db: AsyncSession = Depends(get_db),
         user_permission: User = Security(get_current_user, scopes=["assign permissions"])
 ):
     try:
-        current_user = db.query(User).filter(User.id == user_permissions.user_id).first()
+        current_user = await db.scalar(select(User.id).where(User.id == user_permissions.user_id))
         if current_user is None:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail='No existe el usuario que desea asignar los permissions'
             )
-        for id in user_permissions.permissions_ids:
-            current_permission = db.query(Permission).filter(Permission.id == id).first()
-            if current_permission is not None and current_permission not in current_user.permissions:
-                current_user.permissions.append(current_permission)
-                db.commit()
-
+        result = await assign_links(
+            db, UserHasPermissions, "user_id", user_permissions.user_id, "permission_id", Permission,
+            user_permissions.permissions_ids
+        )
+        invalidate("user", user_permissions.user_id)
         return {
-            "message": "Se ha asignado los permissions al usuario correctamente"
+            "message": "Se ha asignado los permissions al usuario correctamente",
+            "data": result
         }
+    except PoolTimeoutError:
+        raise
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(
             status_code=status.HTTP_409_CONFLICT,
             detail=f"Error al asignar los permisos al usuario {e}"
@@ -311,25 +507,89 @@ def assign_permissions(
     status_code=status.HTTP_200_OK,
     tags=["users"]
 )
-def get_avatar(id: int, db: Session = Depends(get_db)):
+async def get_avatar(
+        id: int,
+        size: int | None = Query(None, description="Tamaño de la miniatura (64, 128 o 256)"),
+        accept: str | None = Header(None),
+        if_none_match: str | None = Header(None),
+        db: AsyncSession = Depends(get_db)
+):
+    if size is not None and size not in THUMBNAIL_SIZES:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"El tamaño debe ser uno de {', '.join(str(value) for value in THUMBNAIL_SIZES)}"
+        )
     try:
-        user = db.query(User).filter(User.id == id).first()
-        if user is None:
+        avatar = get_cached("avatar", id)
+        if avatar is None:
+            avatar = await db.scalar(select(User.avatar).where(User.id == id))
+            if avatar is None:
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail="No existe el usuario que desea obtener el avatar"
+                )
+            set_cached("avatar", id, avatar)
+        saved_avatar_path = avatar_path(avatar)
+        if saved_avatar_path is None or not os.path.isfile(saved_avatar_path):
             raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="No existe el usuario que desea obtener el avatar"
-            )
-        saved_avatar_path = os.path.join("services", "security", user.avatar)
-        if not os.path.exists(saved_avatar_path):
-            return HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="No existe el avatar del usuario"
             )
+        etag = avatar_etag(avatar)
+        if etag is not None:
+            filename = os.path.basename(avatar)
+            cache_control = f"public, max-age={AVATAR_REDIRECT_MAX_AGE}"
+            headers = {"ETag": etag, "Cache-Control": cache_control}
+            if size is not None:
+                filename = thumbnail_name(filename.split(".")[0], size, accept)
+                headers = {"ETag": avatar_etag(filename), "Cache-Control": cache_control, "Vary": "Accept"}
+            if if_none_match is not None and headers["ETag"] in [tag.strip() for tag in if_none_match.split(",")]:
+                return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+            return RedirectResponse(
+                f"/api/v1/avatars/{filename}",
+                status_code=status.HTTP_307_TEMPORARY_REDIRECT,
+                headers=headers
+            )
 
-        return FileResponse(saved_avatar_path, media_type="image/png")
+        return FileResponse(saved_avatar_path, media_type=avatar_media_type(avatar))
+    except (HTTPException, PoolTimeoutError):
+        raise
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(
             status_code=status.HTTP_409_CONFLICT,
             detail=f"Error al obtener el avatar: {e}"
-        )
\ No newline at end of file
+        )
+
+@router.get(
+    '/avatars/{filename}',
+    status_code=status.HTTP_200_OK,
+    tags=["users"]
+)
+async def get_avatar_file(filename: str, if_none_match: str | None = Header(None)):
+    if not CONTENT_ADDRESSED.match(filename):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="No existe el avatar solicitado"
+        )
+    relative_path = os.path.join(AVATARS_PATH, filename)
+    etag = avatar_etag(relative_path)
+    headers = {"ETag": etag, "Cache-Control": "public, max-age=31536000, immutable"}
+    if if_none_match is not None and etag in [tag.strip() for tag in if_none_match.split(",")]:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    saved_avatar_path = os.path.join(BASE_PATH, relative_path)
+    if THUMBNAIL_NAME.match(filename):
+        try:
+            saved_avatar_path = await run_in_threadpool(ensure_thumbnail, filename)
+        except Exception as e:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail=f"Error al obtener el avatar: {e}"
+            )
+    if saved_avatar_path is None or not os.path.exists(saved_avatar_path):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="No existe el avatar solicitado"
+        )
+    return FileResponse(saved_avatar_path, media_type=avatar_media_type(relative_path), headers=headers)
@@ -0,0 +1,38 @@
+from fastapi import APIRouter, Depends, Header, status
+from fastapi.responses import Response
+from sqlalchemy.ext.asyncio import AsyncSession
+from services.security.utils.dependency import get_db
+from services.security.utils.keys import jwks
+from services.security.utils.scopes import get_scope_registry
+import hashlib
+import orjson
+import os
+
+JWKS_MAX_AGE = int(os.getenv("JWKS_MAX_AGE", "300"))
+
+router = APIRouter()
+
+def cached_json(document: dict, max_age: int, if_none_match: str | None) -> Response:
+    body = orjson.dumps(document, option=orjson.OPT_SORT_KEYS)
+    etag = f'"{hashlib.sha256(body).hexdigest()[:32]}"'
+    headers = {"ETag": etag, "Cache-Control": f"public, max-age={max_age}"}
+    if if_none_match == etag:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+@router.get(
+    "/.well-known/jwks.json",
+    status_code=status.HTTP_200_OK,
+    tags=["auth"]
+)
+async def get_jwks(if_none_match: str | None = Header(None)):
+    return cached_json(jwks(), JWKS_MAX_AGE, if_none_match)
+
+@router.get(
+    "/.well-known/scopes.json",
+    status_code=status.HTTP_200_OK,
+    tags=["auth"]
+)
+async def get_scopes(if_none_match: str | None = Header(None), db: AsyncSession = Depends(get_db)):
+    registry = await get_scope_registry(db)
+    return cached_json({"version": registry.version, "scopes": registry.bits}, JWKS_MAX_AGE, if_none_match)
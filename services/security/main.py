@@ -1,44 +1,77 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
+from fastapi.responses import ORJSONResponse
 from starlette.middleware.cors import CORSMiddleware
-from services.security.config.database import Base, engine
+from services.security.config.database import engine, async_engine, AsyncSessionLocal, DB_POOL_WARMUP
 from fastapi_pagination import add_pagination
 #ROUTES
 from services.security.controllers.user import router as user_router
 from services.security.controllers.auth import router as auth_router
 from services.security.controllers.role import router as role_router
-#MODELS
-from services.security.models.permission import Permission
-from services.security.models.user import User
-from services.security.models.role import Role
-from services.security.models.user_has_permissions import UserHasPermissions
-from services.security.models.role_has_permissions import RoleHasPermissions
-from services.security.models.user_has_roles import UserHasRoles
-#SEEDERS
-from services.security.seeders.seed import seed
-import os
+from services.security.controllers.well_known import router as well_known_router
+from services.security.controllers.metrics import router as metrics_router
+from services.security.controllers.profile import router as profile_router
+#CACHES
+from services.security.utils.role_permissions import load_role_permissions
+from services.security.utils.scopes import load_scope_registry
+from services.security.utils.hashing import shutdown_executor, warm_executor
+from services.security.utils.tokens import check_stateless_auth
+from services.security.utils.pool import pool_timeout_handler, warm_up
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from services.security.utils.files import UploadLimitMiddleware
+#METRICS
+from services.security.utils.metrics import METRICS_ENABLED, MetricsMiddleware, instrument_engine
+from services.security.utils import query_inspector
+from services.security.utils.profiler import PROFILER_ENABLED, ProfilerMiddleware
 
-debug = os.getenv("DEBUG", "False").lower() == "true"
-app = FastAPI()
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # POOL
+    await warm_up(async_engine, DB_POOL_WARMUP)
+    # HASHING
+    await warm_executor()
+    # CACHES
+    async with AsyncSessionLocal() as db:
+        await load_role_permissions(db)
+        await load_scope_registry(db)
+    yield
+    shutdown_executor()
+    await async_engine.dispose()
 
-origins = [
-    "*"
-]
+def create_app() -> FastAPI:
+    check_stateless_auth()
+    app = FastAPI(lifespan=lifespan, default_response_class=ORJSONResponse)
 
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=origins,
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
-# CREATE TABLES
-if debug:
-    Base.metadata.drop_all(bind=engine)
-Base.metadata.create_all(bind=engine)
-# SEEDING
-seed()
-#ROUTES
-app.include_router(user_router, prefix="/api/v1", tags=["users"])
-app.include_router(auth_router, prefix="/api/v1", tags=["auth"])
-app.include_router(role_router, prefix="/api/v1", tags=["roles"])
-add_pagination(app)
+    origins = [
+        "*"
+    ]
+
+    app.add_exception_handler(PoolTimeoutError, pool_timeout_handler)
+    app.add_middleware(UploadLimitMiddleware)
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=origins,
+        allow_credentials=True,
+        allow_methods=["*"],
+        allow_headers=["*"],
+    )
+    #ROUTES
+    app.include_router(user_router, prefix="/api/v1", tags=["users"])
+    app.include_router(auth_router, prefix="/api/v1", tags=["auth"])
+    app.include_router(role_router, prefix="/api/v1", tags=["roles"])
+    app.include_router(well_known_router, tags=["auth"])
+    if METRICS_ENABLED:
+        instrument_engine(engine, "sync")
+        instrument_engine(async_engine.sync_engine, "async")
+        app.add_middleware(MetricsMiddleware)
+        app.include_router(metrics_router)
+    query_inspector.instrument_engine(engine)
+    query_inspector.instrument_engine(async_engine.sync_engine)
+    app.add_middleware(query_inspector.QueryInspectorMiddleware)
+    if PROFILER_ENABLED:
+        app.add_middleware(ProfilerMiddleware)
+        app.include_router(profile_router, prefix="/api/v1", tags=["profiles"])
+    add_pagination(app)
+    return app
+
+app = create_app()
@@ -0,0 +1,90 @@
+from services.security.config.database import Base, engine
+#MODELS
+from services.security.models.permission import Permission
+from services.security.models.user import User
+from services.security.models.role import Role
+from services.security.models.user_has_permissions import UserHasPermissions
+from services.security.models.role_has_permissions import RoleHasPermissions
+from services.security.models.user_has_roles import UserHasRoles
+from services.security.models.seed_version import SeedVersion
+import argparse
+import json
+import logging
+import statistics
+import subprocess
+import sys
+import time
+
+STARTUP_SNIPPET = (
+    "import time; started = time.perf_counter(); "
+    "from services.security.main import create_app; create_app(); "
+    "print(time.perf_counter() - started)"
+)
+
+def migrate(fresh: bool = False):
+    if fresh:
+        Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    logging.info("Migration completed successfully.")
+
+def seed():
+    from services.security.seeders.seed import seed as run_seed
+    run_seed()
+
+def bench_startup(runs: int) -> dict:
+    import_seconds = []
+    process_seconds = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        output = subprocess.run(
+            [sys.executable, "-c", STARTUP_SNIPPET],
+            check=True, capture_output=True, text=True
+        ).stdout
+        process_seconds.append(time.perf_counter() - started)
+        import_seconds.append(float(output.strip().splitlines()[-1]))
+    return {
+        "runs": runs,
+        "create_app_seconds": {
+            "min": min(import_seconds),
+            "median": statistics.median(import_seconds),
+            "max": max(import_seconds),
+        },
+        "process_seconds": {
+            "min": min(process_seconds),
+            "median": statistics.median(process_seconds),
+            "max": max(process_seconds),
+        },
+    }
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m services.security.manage")
+    commands = parser.add_subparsers(dest="command", required=True)
+    migrate_parser = commands.add_parser("migrate", help="Crea las tablas de la base de datos")
+    migrate_parser.add_argument("--fresh", action="store_true", help="Elimina las tablas antes de crearlas")
+    commands.add_parser("seed", help="Carga los datos iniciales")
+    setup_parser = commands.add_parser("setup", help="Ejecuta migrate y seed")
+    setup_parser.add_argument("--fresh", action="store_true", help="Elimina las tablas antes de crearlas")
+    bench_parser = commands.add_parser("bench-startup", help="Mide el tiempo de arranque de la aplicacion")
+    bench_parser.add_argument("--runs", type=int, default=5)
+    key_parser = commands.add_parser("generate-key", help="Genera una clave de firma para los tokens")
+    key_parser.add_argument("--algorithm", choices=["EdDSA", "ES256"], default="EdDSA")
+    key_parser.add_argument("--kid", default=None, help="Identificador de la clave (por defecto la fecha actual)")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO)
+    if args.command == "migrate":
+        migrate(args.fresh)
+    elif args.command == "seed":
+        seed()
+    elif args.command == "setup":
+        migrate(args.fresh)
+        seed()
+    elif args.command == "bench-startup":
+        print(json.dumps(bench_startup(args.runs), indent=2))
+    elif args.command == "generate-key":
+        from services.security.utils.keys import generate_key
+        kid = args.kid or time.strftime("%Y%m%d%H%M%S")
+        logging.info(f"Clave generada en {generate_key(args.algorithm, kid)}")
+
+if __name__ == "__main__":
+    main()
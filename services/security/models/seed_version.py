@@ -0,0 +1,11 @@
+from sqlalchemy import Text, DateTime
+from sqlalchemy.orm import Mapped, mapped_column
+from services.security.config.database import Base
+import datetime
+
+class SeedVersion(Base):
+    __tablename__ = 'seed_versions'
+
+    file: Mapped[str] = mapped_column(Text, primary_key=True)
+    checksum: Mapped[str] = mapped_column(Text)
+    seeded_at: Mapped[datetime.datetime] = mapped_column(DateTime, default=datetime.datetime.utcnow, onupdate=datetime.datetime.utcnow)
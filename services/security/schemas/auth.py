@@ -5,6 +5,10 @@ class TokenData(BaseModel):
     username: str | None = None
     scopes: list[str] = []
 
+class TokenIntrospect(BaseModel):
+    tokens: list[str]
+    scopes: list[str] = []
+
 class Token(BaseModel):
     token: str
     token_type: str
@@ -24,4 +24,7 @@ class RoleUsers(BaseModel):
 
 class RolePermissions(BaseModel):
     role_id: int
-    permissions_ids: list[int]
\ No newline at end of file
+    permissions_ids: list[int]
+
+class RoleBatch(BaseModel):
+    ids: list[int]
\ No newline at end of file
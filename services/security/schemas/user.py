@@ -1,5 +1,5 @@
-from pydantic import BaseModel, EmailStr
-from typing import List
+from pydantic import BaseModel, EmailStr, Field
+from typing import List, Optional
 from services.security.models.status_enum import StatusEnum
 
 class UserResponse(BaseModel):
@@ -21,4 +21,18 @@ class UserRoles(BaseModel):
 
 class UserPermissions(BaseModel):
     user_id: int
-    permissions_ids: List[int]
\ No newline at end of file
+    permissions_ids: List[int]
+
+class UserBatch(BaseModel):
+    ids: List[int]
+
+class UserImport(BaseModel):
+    code: str
+    name: str
+    last_name: str
+    second_surname: str
+    email: EmailStr
+    password: str
+    phone: int = Field(ge=1, le=2147483647)
+    token_firebase: Optional[str] = None
+    status: StatusEnum = StatusEnum.online
\ No newline at end of file
@@ -1,5 +1,5 @@
-from passlib.context import CryptContext
-from sqlalchemy.exc import IntegrityError
+from sqlalchemy import insert, select, tuple_
+from sqlalchemy.dialects import postgresql, sqlite
 from sqlalchemy.orm import Session
 from services.security.config.database import engine
 from services.security.models.permission import Permission
@@ -8,34 +8,82 @@ from services.security.models.user import User
 from services.security.models.role_has_permissions import RoleHasPermissions
 from services.security.models.user_has_roles import UserHasRoles
 from services.security.models.user_has_permissions import UserHasPermissions
+from services.security.models.seed_version import SeedVersion
+from services.security.utils.role_permissions import invalidate_role_permissions
+from services.security.utils.scopes import invalidate_scope_registry
+from services.security.utils.hashing import hash_passwords
+from pathlib import Path
+from typing import List
+import hashlib
 import json
 import logging
 
-bcrypt_context = CryptContext(schemes=['bcrypt'], deprecated='auto')
+DATA_PATH = Path(__file__).resolve().parent / "data"
 
-def seed_model(path: str, BaseModel, engine = engine):
+SEEDS = [
+    ("permissions.json", Permission, ["action"], True),
+    ("roles.json", Role, ["name"], True),
+    ("users.json", User, ["email"], False),
+    ("role_has_permissions.json", RoleHasPermissions, ["role_id", "permission_id"], False),
+    ("user_has_permissions.json", UserHasPermissions, ["user_id", "permission_id"], False),
+    ("user_has_roles.json", UserHasRoles, ["role_id", "user_id"], False),
+]
+
+def missing_rows(session: Session, BaseModel, keys: List[str], rows: List[dict]) -> List[dict]:
+    key_columns = tuple_(*[getattr(BaseModel, key) for key in keys])
+    existing = set(session.execute(
+        select(*[getattr(BaseModel, key) for key in keys])
+        .where(key_columns.in_([tuple(row[key] for key in keys) for row in rows]))
+    ).tuples())
+    return [row for row in rows if tuple(row[key] for key in keys) not in existing]
+
+def upsert(session: Session, BaseModel, keys: List[str], update: bool, rows: List[dict]):
+    dialect = session.get_bind().dialect.name
+    if dialect not in ("postgresql", "sqlite"):
+        rows = missing_rows(session, BaseModel, keys, rows)
+        if rows:
+            session.execute(insert(BaseModel), rows)
+        return
+
+    statement = (postgresql if dialect == "postgresql" else sqlite).insert(BaseModel)
+    columns = [column for column in rows[0] if column not in keys]
+    if update and columns:
+        statement = statement.on_conflict_do_update(
+            index_elements=keys,
+            set_={column: statement.excluded[column] for column in columns}
+        )
+    else:
+        statement = statement.on_conflict_do_nothing()
+    session.execute(statement, rows)
+
+def seed_model(path: str, BaseModel, keys: List[str], update: bool = False, engine = engine):
     logging.info(f"Seeding model: {BaseModel.__name__} from {path}")
 
     session = Session(bind=engine)
 
     try:
-        with open(path) as f:
-            data = json.load(f)
+        with open(path, "rb") as f:
+            content = f.read()
+        checksum = hashlib.sha256(content).hexdigest()
+        name = Path(path).name
 
-        for entry in data:
-            entity = BaseModel(**entry)
-            if hasattr(entity, "password"):
-                hashed_password = bcrypt_context.hash(entity.password)
-                entity.password = hashed_password
-            session.add(entity)
+        version = session.get(SeedVersion, name)
+        if version is not None and version.checksum == checksum:
+            logging.info(f"Seed {name} is up to date, skipping.")
+            return
 
+        rows = json.loads(content)
+        if rows and hasattr(BaseModel, "password"):
+            rows = missing_rows(session, BaseModel, keys, rows)
+            hashed_passwords = hash_passwords([row["password"] for row in rows])
+            rows = [dict(row, password=hashed_password) for row, hashed_password in zip(rows, hashed_passwords)]
+
+        if rows:
+            upsert(session, BaseModel, keys, update, rows)
+        session.merge(SeedVersion(file=name, checksum=checksum))
         session.commit()
         logging.info("Seeding completed successfully.")
 
-    except IntegrityError as e:
-        session.rollback()
-        logging.error(f"IntegrityError: {e}")
-
     except Exception as e:
         session.rollback()
         logging.error(f"Error seeding model: {e}")
@@ -45,10 +93,7 @@ def seed_model(path: str, BaseModel, engine = engine):
         logging.info("Session closed.")
 
 def seed():
-    seed_model('services/security/seeders/data/permissions.json', Permission)
-    seed_model('services/security/seeders/data/roles.json', Role)
-    seed_model('services/security/seeders/data/users.json', User)
-    seed_model('services/security/seeders/data/role_has_permissions.json', RoleHasPermissions)
-    seed_model('services/security/seeders/data/user_has_permissions.json', UserHasPermissions)
-    seed_model('services/security/seeders/data/user_has_roles.json', UserHasRoles)
-
+    for file, BaseModel, keys, update in SEEDS:
+        seed_model(str(DATA_PATH / file), BaseModel, keys, update)
+    invalidate_role_permissions()
+    invalidate_scope_registry()
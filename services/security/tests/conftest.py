@@ -0,0 +1,86 @@
+from pathlib import Path
+import itertools
+import os
+import sys
+import tempfile
+
+ROOT = Path(__file__).resolve().parents[3]
+DATABASE = Path(tempfile.mkdtemp(prefix="security-tests-")) / "tests.db"
+
+os.environ.update({
+    "DB_URL": f"sqlite:///{DATABASE}",
+    "SECRET_KEY": "test-secret",
+    "ALGORITHM": "HS256",
+    "LOGIN_IP_BURST": "100000",
+    "LOGIN_PHONE_BURST": "100000",
+})
+os.chdir(ROOT)
+sys.path.insert(0, str(ROOT))
+
+import pytest
+from fastapi.testclient import TestClient
+
+ADMIN_PHONE = "123456789"
+ADMIN_PASSWORD = "admin-password"
+USER_PASSWORD = "user-password"
+
+_phones = itertools.count(700000000)
+
+@pytest.fixture(scope="session")
+def app():
+    from services.security.manage import migrate, seed
+    from services.security.main import create_app
+
+    migrate(fresh=True)
+    seed()
+    return create_app()
+
+@pytest.fixture(scope="session")
+def client(app):
+    with TestClient(app) as client:
+        yield client
+
+def login(client: TestClient, phone: str, password: str) -> dict:
+    response = client.post("/api/v1/auth/login", data={"username": phone, "password": password})
+    assert response.status_code == 200, response.text
+    return {"Authorization": f"Bearer {response.json()['token']}"}
+
+def grant(user_id: int, action: str):
+    from sqlalchemy import select
+    from services.security.config.database import SessionLocal
+    from services.security.models.permission import Permission
+    from services.security.models.user_has_permissions import UserHasPermissions
+
+    with SessionLocal() as db:
+        permission_id = db.scalar(select(Permission.id).where(Permission.action == action))
+        db.add(UserHasPermissions(user_id=user_id, permission_id=permission_id))
+        db.commit()
+
+@pytest.fixture(scope="session")
+def admin_headers(client):
+    return login(client, ADMIN_PHONE, ADMIN_PASSWORD)
+
+@pytest.fixture(scope="session")
+def password_hash():
+    from services.security.utils.hashing import get_context
+    return get_context().hash(USER_PASSWORD)
+
+@pytest.fixture
+def make_user(app, password_hash):
+    from services.security.config.database import SessionLocal
+    from services.security.models.user import User
+
+    def make_user(**fields) -> User:
+        phone = next(_phones)
+        user = User(**{
+            "code": str(phone), "name": "test", "last_name": "test", "second_surname": "test",
+            "email": f"user{phone}@example.com", "phone": phone, "password": password_hash,
+            "avatar": "", "token_firebase": "", **fields,
+        })
+        with SessionLocal() as db:
+            db.add(user)
+            db.commit()
+            db.refresh(user)
+            db.expunge(user)
+        return user
+    return make_user
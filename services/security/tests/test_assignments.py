@@ -0,0 +1,63 @@
+from sqlalchemy import func, select
+import itertools
+import pytest
+
+_roles = itertools.count()
+
+@pytest.fixture
+def role(client, admin_headers):
+    response = client.post(
+        "/api/v1/roles", json={"name": f"assigned role {next(_roles)}", "description": "assigned"}, headers=admin_headers
+    )
+    assert response.status_code in (200, 201), response.text
+    return response.json()["data"]
+
+def link_count(model, column: str, owner_id: int) -> int:
+    from services.security.config.database import SessionLocal
+
+    with SessionLocal() as db:
+        return db.scalar(select(func.count()).select_from(model).where(getattr(model, column) == owner_id))
+
+def assign(client, admin_headers, path: str, payload: dict) -> dict:
+    response = client.post(f"/api/v1/{path}", json=payload, headers=admin_headers)
+    assert response.status_code == 201, response.text
+    return response.json()["data"]
+
+def test_assign_permissions_counts_inserted_and_skipped(client, admin_headers, make_user):
+    from services.security.models.user_has_permissions import UserHasPermissions
+
+    user = make_user()
+    payload = {"user_id": user.id, "permissions_ids": [1, 2, 2, 999999]}
+    assert assign(client, admin_headers, "users/assign-permissions", payload) == {"inserted": 2, "skipped": 1}
+    assert link_count(UserHasPermissions, "user_id", user.id) == 2
+
+    assert assign(client, admin_headers, "users/assign-permissions", payload) == {"inserted": 0, "skipped": 3}
+    assert link_count(UserHasPermissions, "user_id", user.id) == 2
+
+def test_assign_roles_is_idempotent_from_either_side(client, admin_headers, make_user, role):
+    from services.security.models.user_has_roles import UserHasRoles
+
+    first, second = make_user(), make_user()
+    payload = {"user_id": first.id, "roles_ids": [role["id"]]}
+    assert assign(client, admin_headers, "users/assign-roles", payload) == {"inserted": 1, "skipped": 0}
+    assert assign(client, admin_headers, "users/assign-roles", payload) == {"inserted": 0, "skipped": 1}
+
+    payload = {"role_id": role["id"], "users_ids": [first.id, second.id]}
+    assert assign(client, admin_headers, "roles/assign-users", payload) == {"inserted": 1, "skipped": 1}
+    assert assign(client, admin_headers, "roles/assign-users", payload) == {"inserted": 0, "skipped": 2}
+    assert link_count(UserHasRoles, "role_id", role["id"]) == 2
+
+def test_assign_role_permissions_is_idempotent(client, admin_headers, role):
+    from services.security.models.role_has_permissions import RoleHasPermissions
+
+    payload = {"role_id": role["id"], "permissions_ids": [1, 3]}
+    assert assign(client, admin_headers, "roles/assign-permissions", payload) == {"inserted": 2, "skipped": 0}
+    assert assign(client, admin_headers, "roles/assign-permissions", payload) == {"inserted": 0, "skipped": 2}
+    assert link_count(RoleHasPermissions, "role_id", role["id"]) == 2
+
+def test_assign_to_a_missing_owner_inserts_nothing(client, admin_headers):
+    response = client.post(
+        "/api/v1/users/assign-roles", json={"user_id": 999999, "roles_ids": [1]}, headers=admin_headers
+    )
+    assert response.status_code != 201
+    assert "No existe" in response.json()["detail"]
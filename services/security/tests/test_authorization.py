@@ -0,0 +1,56 @@
+from sqlalchemy import select
+import pytest
+from services.security.tests.conftest import USER_PASSWORD, login
+
+@pytest.fixture
+def make_role(app):
+    from services.security.config.database import SessionLocal
+    from services.security.models.permission import Permission
+    from services.security.models.role import Role
+
+    def make_role(name: str, actions: list) -> int:
+        with SessionLocal() as db:
+            role = Role(name=name, description=name)
+            role.permissions = list(db.scalars(select(Permission).where(Permission.action.in_(actions))))
+            db.add(role)
+            db.commit()
+            return role.id
+    return make_role
+
+def assign_role(user_id: int, role_id: int):
+    from services.security.config.database import SessionLocal
+    from services.security.models.user_has_roles import UserHasRoles
+
+    with SessionLocal() as db:
+        db.add(UserHasRoles(user_id=user_id, role_id=role_id))
+        db.commit()
+
+def test_scope_mask_round_trip():
+    from services.security.utils.scopes import ScopeRegistry, decode_mask, encode_mask, mask_to_scopes, scopes_to_mask
+
+    registry = ScopeRegistry("v1", {"view users": 1, "delete users": 5, "assign permissions": 13})
+    mask = scopes_to_mask(["view users", "assign permissions"], registry)
+    assert decode_mask(encode_mask(mask)) == mask
+    assert sorted(mask_to_scopes(mask, registry)) == ["assign permissions", "view users"]
+
+def test_empty_mask_does_not_bypass_scope_checks(client, make_user, make_role):
+    role_id = make_role("sin permisos", [])
+    user = make_user()
+    assign_role(user.id, role_id)
+    headers = login(client, str(user.phone), USER_PASSWORD)
+
+    response = client.post(
+        "/api/v1/users/assign-permissions", json={"user_id": user.id, "permissions_ids": [13]}, headers=headers
+    )
+    assert response.status_code == 403
+    assert client.delete(f"/api/v1/users/{user.id}", headers=headers).status_code == 403
+
+def test_mask_only_grants_the_listed_scopes(client, make_user, make_role):
+    role_id = make_role("solo lectura", ["view users"])
+    user = make_user()
+    assign_role(user.id, role_id)
+    headers = login(client, str(user.phone), USER_PASSWORD)
+
+    assert client.get("/api/v1/users", headers=headers).status_code == 200
+    assert client.delete(f"/api/v1/users/{user.id}", headers=headers).status_code == 403
+    assert client.get("/api/v1/roles", headers=headers).status_code == 403
@@ -0,0 +1,217 @@
+from PIL import Image
+from sqlalchemy import select
+import asyncio
+import io
+import json
+import os
+
+def png(color: tuple) -> bytes:
+    buffer = io.BytesIO()
+    Image.new("RGB", (8, 8), color).save(buffer, format="PNG")
+    return buffer.getvalue()
+
+PNG = png((0, 0, 0))
+
+def stored_avatar(user_id: int) -> str:
+    from services.security.config.database import SessionLocal
+    from services.security.models.user import User
+
+    with SessionLocal() as db:
+        return db.scalar(select(User.avatar).where(User.id == user_id))
+
+def upload_user(client, admin_headers, phone: int, content: bytes = PNG) -> dict:
+    form = {
+        "code": str(phone), "name": "avatar", "last_name": "avatar", "second_surname": "avatar",
+        "email": f"avatar{phone}@example.com", "password": "secret", "phone": str(phone), "user_status": "online",
+    }
+    response = client.post(
+        "/api/v1/users", data=form, files={"avatar": ("avatar.png", content, "image/png")}, headers=admin_headers
+    )
+    assert response.status_code == 201, response.text
+    return response.json()["data"]
+
+def test_import_ignores_client_supplied_avatar(client, admin_headers):
+    from services.security.config.database import SessionLocal
+    from services.security.models.user import User
+
+    record = {
+        "code": "imp-1", "name": "imp", "last_name": "imp", "second_surname": "imp",
+        "email": "imported@example.com", "password": "secret", "phone": 800000001,
+        "avatar": "../../../../tmp/victim.txt",
+    }
+    response = client.post(
+        "/api/v1/users/import", content=json.dumps(record) + "\n",
+        headers={**admin_headers, "Content-Type": "application/x-ndjson"}
+    )
+    assert response.status_code == 200
+    with SessionLocal() as db:
+        assert db.scalar(select(User.avatar).where(User.email == "imported@example.com")) == ""
+
+def test_avatar_outside_avatars_directory_is_not_served_or_deleted(client, admin_headers, make_user, tmp_path):
+    victim = tmp_path / "victim.txt"
+    victim.write_text("secreto")
+    user = make_user(avatar=os.path.relpath(victim, os.path.join("services", "security")))
+
+    response = client.get(f"/api/v1/users/{user.id}/avatar")
+    assert response.status_code == 404
+    assert "secreto" not in response.text
+
+    response = client.delete(f"/api/v1/users/{user.id}", headers=admin_headers)
+    assert response.status_code == 200
+    assert victim.exists()
+
+def test_empty_avatar_returns_404(client, make_user):
+    user = make_user(avatar="")
+    assert client.get(f"/api/v1/users/{user.id}/avatar").status_code == 404
+
+def test_missing_avatar_file_returns_404(client, make_user):
+    user = make_user(avatar=os.path.join("static", "avatars", f"{'0' * 64}.png"))
+    assert client.get(f"/api/v1/users/{user.id}/avatar").status_code == 404
+
+def test_avatar_redirect_and_file_honour_etag(client, admin_headers):
+    user = upload_user(client, admin_headers, 800000101, png((1, 2, 3)))
+    try:
+        response = client.get(f"/api/v1/users/{user['id']}/avatar", follow_redirects=False)
+        assert response.status_code == 307
+        etag, location = response.headers["etag"], response.headers["location"]
+
+        response = client.get(
+            f"/api/v1/users/{user['id']}/avatar", headers={"If-None-Match": etag}, follow_redirects=False
+        )
+        assert response.status_code == 304
+
+        response = client.get(location)
+        assert response.status_code == 200
+        assert response.content == png((1, 2, 3))
+        assert "immutable" in response.headers["cache-control"]
+        assert client.get(location, headers={"If-None-Match": etag}).status_code == 304
+    finally:
+        client.delete(f"/api/v1/users/{user['id']}", headers=admin_headers)
+
+def test_shared_avatar_is_kept_until_last_reference_is_deleted(client, admin_headers):
+    first = upload_user(client, admin_headers, 800000201, png((4, 5, 6)))
+    second = upload_user(client, admin_headers, 800000202, png((4, 5, 6)))
+    assert stored_avatar(first["id"]) == stored_avatar(second["id"])
+    path = os.path.join("services", "security", stored_avatar(first["id"]))
+
+    assert client.delete(f"/api/v1/users/{first['id']}", headers=admin_headers).status_code == 200
+    assert os.path.exists(path)
+    assert client.delete(f"/api/v1/users/{second['id']}", headers=admin_headers).status_code == 200
+    assert not os.path.exists(path)
+
+def test_remove_waits_for_a_concurrent_upload_of_the_same_avatar(app, make_user):
+    from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+    from sqlalchemy.pool import NullPool
+    from services.security.config.database import SQLALCHEMY_ASYNC_DB_URL
+    from services.security.utils.files import AVATARS_PATH, avatar_lock, remove_avatar_if_unused
+
+    relative_path = os.path.join(AVATARS_PATH, f"{'a' * 64}.png")
+    absolute_path = os.path.join("services", "security", relative_path)
+    os.makedirs(os.path.dirname(absolute_path), exist_ok=True)
+    with open(absolute_path, "wb") as file:
+        file.write(PNG)
+
+    async def scenario():
+        engine = create_async_engine(SQLALCHEMY_ASYNC_DB_URL, poolclass=NullPool)
+        try:
+            async with AsyncSession(engine) as db:
+                async with avatar_lock(relative_path):
+                    removal = asyncio.create_task(remove_avatar_if_unused(db, relative_path))
+                    await asyncio.sleep(0.05)
+                    assert not removal.done()
+                    make_user(avatar=relative_path)
+                await removal
+        finally:
+            await engine.dispose()
+
+    try:
+        asyncio.run(scenario())
+        assert os.path.exists(absolute_path)
+    finally:
+        os.remove(absolute_path)
+
+def test_oversized_form_is_rejected_before_it_is_parsed(client, admin_headers, monkeypatch):
+    from services.security.utils import files
+    from starlette.requests import Request
+
+    parsed = []
+    original_form = Request.form
+    monkeypatch.setattr(Request, "form", lambda self, **kwargs: parsed.append(1) or original_form(self, **kwargs))
+    content = PNG + b"\0" * files.UPLOAD_MAX_BYTES
+    response = client.post(
+        "/api/v1/users", data={"code": "big"}, files={"avatar": ("avatar.png", content, "image/png")},
+        headers=admin_headers
+    )
+    assert response.status_code == 413
+    assert parsed == []
+
+def test_streamed_form_without_content_length_is_cut_off():
+    from fastapi import FastAPI, Request
+    from fastapi.testclient import TestClient
+    from services.security.utils.files import UploadLimitMiddleware
+
+    app = FastAPI()
+    app.add_middleware(UploadLimitMiddleware, max_bytes=1024)
+
+    @app.post("/upload")
+    async def upload(request: Request):
+        return {"size": len(await request.body())}
+
+    def chunks(count: int):
+        for _ in range(count):
+            yield b"x" * 512
+
+    with TestClient(app) as client:
+        headers = {"content-type": "multipart/form-data; boundary=x"}
+        assert client.post("/upload", content=chunks(2), headers=headers).json() == {"size": 1024}
+        assert client.post("/upload", content=chunks(3), headers=headers).status_code == 413
+
+def test_avatar_errors_keep_their_status(client, admin_headers, make_user, monkeypatch):
+    from services.security.utils import files
+
+    form = {
+        "code": "bad-avatar", "name": "a", "last_name": "a", "second_surname": "a",
+        "email": "bad-avatar@example.com", "password": "secret", "phone": "799999999", "user_status": "online",
+    }
+    response = client.post(
+        "/api/v1/users", data=form, files={"avatar": ("avatar.png", b"not an image", "image/png")}, headers=admin_headers
+    )
+    assert response.status_code == 400
+
+    monkeypatch.setattr(files, "AVATAR_MAX_BYTES", 16)
+    user = make_user()
+    response = client.put(
+        f"/api/v1/users/{user.id}", data={**form, "phone": str(user.phone), "email": user.email},
+        files={"avatar": ("avatar.png", PNG, "image/png")}, headers=admin_headers
+    )
+    assert response.status_code == 413
+    leftovers = [name for name in os.listdir(os.path.join(files.BASE_PATH, files.AVATARS_PATH)) if name.startswith(".upload-")]
+    assert leftovers == []
+
+def test_avatar_redirect_is_cached_until_the_avatar_changes(client, admin_headers):
+    from services.security.utils.cache import get_cached
+
+    user = upload_user(client, admin_headers, 800000301, png((7, 8, 9)))
+    try:
+        response = client.get(f"/api/v1/users/{user['id']}/avatar", follow_redirects=False)
+        assert response.status_code == 307
+        assert "max-age=" in response.headers["cache-control"]
+        assert get_cached("avatar", user["id"]) == stored_avatar(user["id"])
+        location = response.headers["location"]
+
+        form = {
+            "code": "800000301", "name": "avatar", "last_name": "avatar", "second_surname": "avatar",
+            "email": "avatar800000301@example.com", "password": "secret", "phone": "800000301", "user_status": "online",
+        }
+        response = client.put(
+            f"/api/v1/users/{user['id']}", data=form,
+            files={"avatar": ("avatar.png", png((9, 8, 7)), "image/png")}, headers=admin_headers
+        )
+        assert response.status_code == 200, response.text
+        assert get_cached("avatar", user["id"]) is None
+
+        response = client.get(f"/api/v1/users/{user['id']}/avatar", follow_redirects=False)
+        assert response.headers["location"] != location
+    finally:
+        client.delete(f"/api/v1/users/{user['id']}", headers=admin_headers)
+    assert get_cached("avatar", user["id"]) is None
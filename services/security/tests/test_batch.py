@@ -0,0 +1,43 @@
+from services.security.utils import batch
+from services.security.utils.query_inspector import query_budget
+
+def test_user_batch_keeps_request_order_and_reports_missing_ids(client, admin_headers, make_user):
+    first, second = make_user(), make_user()
+    response = client.post(
+        "/api/v1/users/batch", json={"ids": [second.id, 999999, first.id, second.id]}, headers=admin_headers
+    )
+    assert response.status_code == 200
+    body = response.json()
+    assert list(body["data"]) == [str(second.id), "999999", str(first.id)]
+    assert body["data"][str(first.id)]["phone"] == first.phone
+    assert body["data"]["999999"] is None
+    assert body["not_found"] == [999999]
+
+def test_user_ids_query_matches_the_batch_endpoint(client, admin_headers, make_user):
+    user = make_user()
+    response = client.get("/api/v1/users", params={"ids": f"{user.id},999999"}, headers=admin_headers)
+    assert response.status_code == 200
+    assert response.json()["not_found"] == [999999]
+    assert client.get("/api/v1/users", params={"ids": "1,uno"}, headers=admin_headers).status_code == 400
+
+def test_role_batch(client, admin_headers):
+    response = client.post("/api/v1/roles/batch", json={"ids": [1, 999999]}, headers=admin_headers)
+    assert response.status_code == 200
+    assert response.json()["data"]["1"]["id"] == 1
+    assert response.json()["not_found"] == [999999]
+
+def test_batch_limits(client, admin_headers, monkeypatch):
+    monkeypatch.setattr(batch, "BATCH_MAX_IDS", 3)
+    assert client.post("/api/v1/users/batch", json={"ids": []}, headers=admin_headers).status_code == 400
+    response = client.post("/api/v1/users/batch", json={"ids": [1, 2, 3, 4]}, headers=admin_headers)
+    assert response.status_code == 400
+    assert client.post("/api/v1/users/batch", json={"ids": [1, 1, 2, 3]}, headers=admin_headers).status_code == 200
+
+def test_batch_loads_missing_users_with_a_single_query(client, admin_headers, make_user):
+    from services.security.utils.cache import invalidate_all
+
+    ids = [make_user().id for _ in range(10)]
+    client.get("/api/v1/users", headers=admin_headers)
+    invalidate_all("user")
+    with query_budget(3):
+        assert client.post("/api/v1/users/batch", json={"ids": ids}, headers=admin_headers).status_code == 200
@@ -0,0 +1,13 @@
+import sqlite3
+from services.security.benchmarks.__main__ import main
+
+def test_existing_database_is_not_reset_without_confirmation(tmp_path):
+    path = tmp_path / "existing.db"
+    with sqlite3.connect(path) as connection:
+        connection.execute("CREATE TABLE keep (id INTEGER)")
+    assert main(["--database-url", f"sqlite:///{path}", "--scenarios", "login"]) == 2
+    with sqlite3.connect(path) as connection:
+        assert connection.execute("SELECT name FROM sqlite_master").fetchall() == [("keep",)]
+
+def test_avatar_scenario_requires_avatars():
+    assert main(["--avatars", "0", "--scenarios", "avatar"]) == 2
@@ -0,0 +1,82 @@
+import itertools
+import pytest
+from services.security.utils import cache
+from services.security.utils.cache import get_cached
+
+_roles = itertools.count()
+
+@pytest.fixture
+def role(client, admin_headers):
+    name = f"cached role {next(_roles)}"
+    response = client.post("/api/v1/roles", json={"name": name, "description": "cached"}, headers=admin_headers)
+    assert response.status_code in (200, 201), response.text
+    return response.json()["data"]
+
+def show_user(client, admin_headers, user_id: int):
+    return client.get(f"/api/v1/users/{user_id}", headers=admin_headers)
+
+def test_update_invalidates_the_cached_user(client, admin_headers, make_user):
+    user = make_user()
+    assert show_user(client, admin_headers, user.id).json()["data"]["name"] == user.name
+    form = {
+        "code": user.code, "name": "renamed", "last_name": user.last_name, "second_surname": user.second_surname,
+        "email": user.email, "phone": str(user.phone), "user_status": "online",
+    }
+    assert client.put(f"/api/v1/users/{user.id}", data=form, headers=admin_headers).status_code == 200
+    assert show_user(client, admin_headers, user.id).json()["data"]["name"] == "renamed"
+
+def test_destroy_invalidates_the_cached_user(client, admin_headers, make_user):
+    user = make_user()
+    assert show_user(client, admin_headers, user.id).status_code == 200
+    assert client.delete(f"/api/v1/users/{user.id}", headers=admin_headers).status_code == 200
+    response = show_user(client, admin_headers, user.id)
+    assert response.status_code != 200 and "No existe" in response.json()["detail"]
+
+def test_user_assignments_invalidate_the_cached_user_and_roles(client, admin_headers, make_user, role):
+    user = make_user()
+    show_user(client, admin_headers, user.id)
+    client.get(f"/api/v1/roles/{role['id']}", headers=admin_headers)
+    assert get_cached("user", user.id) is not None and get_cached("role", role["id"]) is not None
+
+    response = client.post(
+        "/api/v1/users/assign-roles", json={"user_id": user.id, "roles_ids": [role["id"]]}, headers=admin_headers
+    )
+    assert response.status_code == 201
+    assert get_cached("user", user.id) is None and get_cached("role", role["id"]) is None
+
+    show_user(client, admin_headers, user.id)
+    response = client.post(
+        "/api/v1/users/assign-permissions", json={"user_id": user.id, "permissions_ids": [1]}, headers=admin_headers
+    )
+    assert response.status_code == 201
+    assert get_cached("user", user.id) is None
+
+def test_role_update_destroy_and_assign_users_invalidate_the_cache(client, admin_headers, make_user, role):
+    role_url = f"/api/v1/roles/{role['id']}"
+    assert client.get(role_url, headers=admin_headers).json()["data"]["name"] == role["name"]
+    assert client.put(role_url, json={"name": "renamed role"}, headers=admin_headers).status_code == 200
+    assert client.get(role_url, headers=admin_headers).json()["data"]["name"] == "renamed role"
+
+    user = make_user()
+    show_user(client, admin_headers, user.id)
+    response = client.post(
+        "/api/v1/roles/assign-users", json={"role_id": role["id"], "users_ids": [user.id]}, headers=admin_headers
+    )
+    assert response.status_code == 201
+    assert get_cached("user", user.id) is None
+
+    assert client.delete(role_url, headers=admin_headers).status_code == 200
+    response = client.get(role_url, headers=admin_headers)
+    assert response.status_code != 200 and "No existe" in response.json()["detail"]
+
+def test_memory_cache_expires_and_deletes_by_prefix(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(cache.time, "monotonic", lambda: now[0])
+    entries = cache.MemoryCache(ttl=10, max_size=10)
+    entries.set("user:1", "a")
+    entries.set("user:2", "b")
+    entries.set("role:1", "c")
+    entries.delete_prefix("user:")
+    assert entries.get("user:1") is None and entries.get("role:1") == "c"
+    now[0] += 11
+    assert entries.get("role:1") is None
@@ -0,0 +1,34 @@
+import asyncio
+from services.security.utils import hashing
+
+def test_warmup_starts_every_hashing_worker(monkeypatch):
+    monkeypatch.setattr(hashing, "HASH_WORKERS", 2)
+    hashing.shutdown_executor()
+    try:
+        assert 1 <= asyncio.run(hashing.warm_executor()) <= 2
+        assert len(hashing.get_executor()._processes) == 2
+    finally:
+        hashing.shutdown_executor()
+
+def test_warmup_can_be_disabled(monkeypatch):
+    monkeypatch.setattr(hashing, "HASH_WARMUP", False)
+    assert asyncio.run(hashing.warm_executor()) == 0
+
+def test_hash_many_submits_one_password_at_a_time_per_slot(monkeypatch):
+    running = [0]
+    peak = [0]
+    submitted = []
+
+    async def submit(fn, password):
+        submitted.append(password)
+        running[0] += 1
+        peak[0] = max(peak[0], running[0])
+        await asyncio.sleep(0.001)
+        running[0] -= 1
+        return f"hash-{password}"
+
+    monkeypatch.setattr(hashing, "_submit", submit)
+    monkeypatch.setattr(hashing, "HASH_BATCH_CONCURRENCY", 2)
+    passwords = [str(i) for i in range(10)]
+    assert asyncio.run(hashing.hash_many(passwords)) == [f"hash-{password}" for password in passwords]
+    assert sorted(submitted) == sorted(passwords) and peak[0] == 2
@@ -0,0 +1,43 @@
+import itertools
+import json
+
+HEADER = b"code,name,last_name,second_surname,email,password,phone\n"
+_phones = itertools.count(810000000)
+
+def row(name: str = "import", phone: int | None = None) -> bytes:
+    phone = phone if phone is not None else next(_phones)
+    return f'I{phone},{name},import,import,import{phone}@example.com,secret,{phone}\n'.encode()
+
+def run_import(client, admin_headers, body: bytes) -> list:
+    response = client.post(
+        "/api/v1/users/import", content=body, headers={**admin_headers, "Content-Type": "text/csv"}
+    )
+    assert response.status_code == 200
+    return [json.loads(line) for line in response.text.splitlines()]
+
+def test_invalid_utf8_line_is_reported_and_the_rest_is_imported(client, admin_headers):
+    results = run_import(client, admin_headers, HEADER + row() + b"\xff\xfe,broken\n" + row())
+    assert {"line": 3, "status": "error", "detail": "la linea no es texto UTF-8 valido"} in results
+    assert results[-1] == {"summary": {"created": 2, "skipped": 0, "errors": 1}}
+
+def test_out_of_range_phone_only_fails_its_own_row(client, admin_headers):
+    results = run_import(client, admin_headers, HEADER + row() + row(phone=2 ** 40) + row())
+    errors = [result for result in results if result.get("status") == "error"]
+    assert len(errors) == 1 and errors[0]["line"] == 3 and "phone" in errors[0]["detail"]
+    assert results[-1]["summary"]["created"] == 2
+
+def test_quoted_fields_may_span_lines(client, admin_headers):
+    from sqlalchemy import select
+    from services.security.config.database import SessionLocal
+    from services.security.models.user import User
+
+    results = run_import(client, admin_headers, HEADER + row(name='"Ana\nMaria"') + row())
+    created = [result for result in results if result.get("status") == "created"]
+    assert [result["line"] for result in created] == [2, 4]
+    with SessionLocal() as db:
+        assert db.scalar(select(User.name).where(User.id == created[0]["id"])) == "Ana\nMaria"
+
+def test_unterminated_quote_is_reported(client, admin_headers):
+    results = run_import(client, admin_headers, HEADER + row() + row(name='"Ana'))
+    assert {"line": 3, "status": "error", "detail": "hay un campo entre comillas sin cerrar"} in results
+    assert results[-1]["summary"]["created"] == 1
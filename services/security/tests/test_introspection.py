@@ -0,0 +1,25 @@
+from services.security.tests.conftest import USER_PASSWORD, grant, login
+from services.security.utils import tokens
+
+def test_introspection_requires_its_own_scope(client, make_user):
+    user = make_user()
+    grant(user.id, "view users")
+    headers = login(client, str(user.phone), USER_PASSWORD)
+    assert client.get("/api/v1/users", headers=headers).status_code == 200
+
+    response = client.post("/api/v1/auth/introspect", json={"tokens": [], "scopes": []}, headers=headers)
+    assert response.status_code == 403
+    assert response.json()["detail"] == "Su usuario no tiene los permisos necesarios para realizar esta accion"
+
+def test_introspected_tokens_are_not_memoized(client, admin_headers, make_user):
+    user = make_user()
+    token = login(client, str(user.phone), USER_PASSWORD)["Authorization"].split()[1]
+    response = client.post(
+        "/api/v1/auth/introspect", json={"tokens": [token, "not-a-token"], "scopes": ["view users"]},
+        headers=admin_headers
+    )
+    assert response.status_code == 200
+    first, second = response.json()["data"]
+    assert first["active"] and first["id"] == user.id and not first["allowed"]
+    assert second == {"active": False}
+    assert token not in tokens._decoded_tokens
@@ -0,0 +1,20 @@
+from services.security.utils import metrics
+
+def test_metrics_route_is_disabled_by_default(client):
+    assert not metrics.METRICS_ENABLED
+    assert client.get("/metrics").status_code == 404
+
+def test_monotonic_stats_are_exported_as_counters(client, admin_headers):
+    output = metrics.render()
+    for name in ("hashing_completed_total", "login_rate_limit_failures_total", "cache_hits_total"):
+        assert f"# TYPE {name} counter" in output
+    assert "hashing_completed " not in output and "# TYPE cache_size gauge" in output
+
+def test_pool_checkouts_are_counted_with_pool_events(client, admin_headers):
+    from services.security.config.database import async_engine
+
+    metrics.instrument_engine(async_engine.sync_engine, "async")
+    assert "connect" not in vars(async_engine.sync_engine.pool)
+    before = metrics._counters.get("db_pool_checkouts_total", {}).get((("engine", "async"),), 0)
+    assert client.get("/api/v1/users", headers=admin_headers).status_code == 200
+    assert metrics._counters["db_pool_checkouts_total"][(("engine", "async"),)] > before
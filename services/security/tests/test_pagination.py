@@ -0,0 +1,64 @@
+from sqlalchemy import func, select
+import base64
+
+def all_ids(model) -> list:
+    from services.security.config.database import SessionLocal
+
+    with SessionLocal() as db:
+        return db.scalars(select(model.id).order_by(model.id)).all()
+
+def test_cursor_walks_every_user_once_in_order(client, admin_headers, make_user):
+    from services.security.models.user import User
+
+    for _ in range(5):
+        make_user()
+    expected = all_ids(User)
+
+    seen, url = [], "/api/v1/users?after=&size=2"
+    while url is not None:
+        response = client.get(url, headers=admin_headers)
+        assert response.status_code == 200, response.text
+        body = response.json()
+        assert len(body["data"]) <= 2
+        assert body["total"] is None
+        seen.extend(user["id"] for user in body["data"])
+        url = body["links"]["next"]
+    assert seen == expected
+
+def test_cursor_round_trips_the_last_id(client, admin_headers, make_user):
+    from services.security.utils.pagination import decode_cursor, encode_cursor
+
+    assert decode_cursor(encode_cursor(42)) == 42
+    first, second = make_user(), make_user()
+    response = client.get(f"/api/v1/users?after={encode_cursor(first.id)}&size=1", headers=admin_headers)
+    assert response.status_code == 200
+    assert [user["id"] for user in response.json()["data"]] == [second.id]
+
+def test_invalid_cursor_is_rejected(client, admin_headers):
+    not_json = base64.urlsafe_b64encode(b"not json").decode().rstrip("=")
+    no_id = base64.urlsafe_b64encode(b'{"page":1}').decode().rstrip("=")
+    for cursor in ("!!!", not_json, no_id):
+        for resource in ("users", "roles"):
+            response = client.get(f"/api/v1/{resource}?after={cursor}", headers=admin_headers)
+            assert response.status_code == 400, (resource, cursor)
+            assert response.json()["detail"] == "El cursor de paginacion no es valido"
+
+def test_include_total_is_opt_in_and_kept_in_the_links(client, admin_headers, make_user):
+    from services.security.config.database import SessionLocal
+    from services.security.models.role import Role
+    from services.security.models.user import User
+
+    make_user()
+    make_user()
+    with SessionLocal() as db:
+        users, roles = db.scalar(select(func.count()).select_from(User)), db.scalar(select(func.count()).select_from(Role))
+
+    body = client.get("/api/v1/users?after=&size=1&include_total=true", headers=admin_headers).json()
+    assert body["total"] == users
+    assert "include_total=true" in body["links"]["next"]
+    assert "include_total=true" in body["links"]["first"]
+    assert client.get(body["links"]["next"], headers=admin_headers).json()["total"] == users
+
+    body = client.get("/api/v1/roles?after=&size=100&include_total=true", headers=admin_headers).json()
+    assert body["total"] == roles
+    assert client.get("/api/v1/roles?after=&size=100", headers=admin_headers).json()["total"] is None
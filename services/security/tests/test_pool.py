@@ -0,0 +1,37 @@
+import pytest
+from sqlalchemy import event
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+
+@pytest.fixture
+def checkouts():
+    from services.security.config.database import async_engine
+
+    counted = []
+    listener = lambda *args: counted.append(1)
+    event.listen(async_engine.sync_engine, "checkout", listener)
+    yield counted
+    event.remove(async_engine.sync_engine, "checkout", listener)
+
+def test_cached_requests_do_not_check_out_a_connection(client, admin_headers, make_user, checkouts, monkeypatch):
+    from services.security.utils import security
+
+    monkeypatch.setattr(security, "STATELESS_AUTH", True)
+    user = make_user()
+    assert client.get(f"/api/v1/users/{user.id}", headers=admin_headers).status_code == 200
+    assert client.get("/.well-known/scopes.json").status_code == 200
+    checkouts.clear()
+
+    assert client.get(f"/api/v1/users/{user.id}", headers=admin_headers).status_code == 200
+    assert client.get("/.well-known/scopes.json").status_code == 200
+    assert checkouts == []
+
+def test_pool_timeout_inside_a_controller_returns_503(client, admin_headers, monkeypatch):
+    from sqlalchemy.ext.asyncio import AsyncSession
+
+    async def exhausted(self, *args, **kwargs):
+        raise PoolTimeoutError("QueuePool limit reached")
+
+    monkeypatch.setattr(AsyncSession, "execute", exhausted)
+    response = client.post("/api/v1/roles/batch", json={"ids": [999998]}, headers=admin_headers)
+    assert response.status_code == 503
+    assert response.headers["retry-after"] == "1"
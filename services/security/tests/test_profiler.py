@@ -0,0 +1,59 @@
+import asyncio
+import threading
+import time
+from services.security.utils import profiler
+
+def busy(seconds: float):
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        pass
+
+def test_samples_from_other_tasks_are_not_attributed_to_the_request():
+    async def other_request():
+        await asyncio.sleep(0)
+        busy(0.1)
+
+    async def profiled_request():
+        sampler = profiler.StackSampler(
+            threading.get_ident(), interval=0.002, loop=asyncio.get_running_loop(), task=asyncio.current_task()
+        )
+        sampler.start()
+        other = asyncio.create_task(other_request())
+        await asyncio.sleep(0)
+        await other
+        busy(0.05)
+        sampler.stop()
+        return sampler.samples
+
+    samples = asyncio.run(profiled_request())
+    assert samples[profiler.OTHER_TASKS] > 0
+    assert not any("other_request" in stack for stack in samples)
+    assert any("profiled_request" in stack and "busy" in stack for stack in samples)
+
+def test_only_one_request_is_profiled_at_a_time(monkeypatch):
+    monkeypatch.setattr(profiler, "should_profile", lambda scope: True)
+    written = []
+    monkeypatch.setattr(profiler, "write_profile", lambda name, samples: written.append(name))
+
+    async def app(scope, receive, send):
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+
+    async def run():
+        sent = []
+
+        async def send(message):
+            sent.append(message)
+
+        await profiler.ProfilerMiddleware(app)({"type": "http", "method": "GET", "path": "/"}, None, send)
+        return dict(sent[0]["headers"])
+
+    assert b"x-profile-id" in asyncio.run(run())
+    with profiler._profiling:
+        assert b"x-profile-id" not in asyncio.run(run())
+    assert len(written) == 1
+
+def test_non_ascii_profile_header_is_rejected(monkeypatch):
+    monkeypatch.setattr(profiler, "PROFILE_SECRET", "secret")
+    monkeypatch.setattr(profiler, "PROFILE_SAMPLE_RATE", 0)
+    assert not profiler.should_profile({"headers": [(b"x-profile", b"\xff")]})
+    assert profiler.should_profile({"headers": [(b"x-profile", b"secret")]})
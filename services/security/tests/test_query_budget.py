@@ -0,0 +1,19 @@
+import pytest
+from services.security.utils import query_inspector
+from services.security.utils.query_inspector import QueryBudgetExceeded, query_budget
+
+def test_budget_is_enforced_without_sql_debug(client, admin_headers):
+    assert not query_inspector.SQL_DEBUG and query_inspector.QUERY_BUDGET is None
+    with query_budget(1):
+        with pytest.raises(QueryBudgetExceeded):
+            client.get("/api/v1/users", headers=admin_headers)
+
+def test_request_within_budget_passes(client, admin_headers):
+    with query_budget(50):
+        assert client.get("/api/v1/users", headers=admin_headers).status_code == 200
+
+def test_queries_are_not_tracked_without_a_budget(client, admin_headers, monkeypatch):
+    created = []
+    monkeypatch.setattr(query_inspector, "RequestQueries", lambda scope: created.append(scope))
+    assert client.get("/api/v1/users", headers=admin_headers).status_code == 200
+    assert created == []
@@ -0,0 +1,72 @@
+import ipaddress
+import pytest
+from fastapi import HTTPException
+from starlette.requests import Request
+from services.security.utils import rate_limit
+
+@pytest.fixture
+def limiter(monkeypatch):
+    backend = rate_limit.MemoryRateLimiter()
+    monkeypatch.setattr(rate_limit, "rate_limiter", backend)
+    monkeypatch.setattr(rate_limit, "LOGIN_BACKOFF_AFTER", 3)
+    return backend
+
+def request_from(host: str, forwarded: str | None = None) -> Request:
+    headers = [(b"x-forwarded-for", forwarded.encode())] if forwarded else []
+    return Request({"type": "http", "method": "POST", "path": "/", "headers": headers, "client": (host, 1234)})
+
+def test_backoff_only_blocks_the_failing_client(limiter):
+    for _ in range(3):
+        rate_limit.check_login("10.0.0.1", "700000001")
+        rate_limit.record_login_failure("10.0.0.1", "700000001")
+
+    with pytest.raises(HTTPException) as error:
+        rate_limit.check_login("10.0.0.1", "700000001")
+    assert error.value.status_code == 429
+    assert int(error.value.headers["Retry-After"]) >= 1
+    rate_limit.check_login("10.0.0.2", "700000001")
+
+def test_successful_login_clears_the_backoff(limiter):
+    for _ in range(2):
+        rate_limit.record_login_failure("10.0.0.1", "700000002")
+    rate_limit.record_login_success("10.0.0.1", "700000002")
+    rate_limit.record_login_failure("10.0.0.1", "700000002")
+    rate_limit.check_login("10.0.0.1", "700000002")
+
+def test_failed_logins_over_http_trigger_backoff(client, make_user, monkeypatch, limiter):
+    user = make_user()
+    for _ in range(3):
+        response = client.post("/api/v1/auth/login", data={"username": str(user.phone), "password": "wrong"})
+        assert response.status_code == 401
+    response = client.post("/api/v1/auth/login", data={"username": str(user.phone), "password": "wrong"})
+    assert response.status_code == 429
+
+def test_forwarded_for_is_ignored_from_untrusted_clients(monkeypatch):
+    monkeypatch.setattr(rate_limit, "TRUSTED_PROXIES", [])
+    assert rate_limit.client_ip(request_from("203.0.113.9", "198.51.100.1")) == "203.0.113.9"
+
+def test_forwarded_for_is_used_behind_trusted_proxies(monkeypatch):
+    monkeypatch.setattr(rate_limit, "TRUSTED_PROXIES", [ipaddress.ip_network("10.0.0.0/8")])
+    request = request_from("10.0.0.5", "198.51.100.1, 203.0.113.7, 10.0.0.4")
+    assert rate_limit.client_ip(request) == "203.0.113.7"
+    assert rate_limit.client_ip(request_from("10.0.0.5")) == "10.0.0.5"
+
+def test_incomplete_backend_fails_on_creation():
+    class Incomplete(rate_limit.RateLimitBackend):
+        def take(self, key: str, capacity: float, rate: float) -> float:
+            return 0.0
+
+    with pytest.raises(TypeError):
+        Incomplete()
+
+def test_failure_count_decays_after_the_window(limiter, monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(rate_limit.time, "monotonic", lambda: now[0])
+    monkeypatch.setattr(rate_limit, "LOGIN_BACKOFF_WINDOW", 60)
+    for _ in range(2):
+        assert limiter.penalize("login-failures:x") == 0
+        now[0] += 30
+    assert limiter.penalize("login-failures:x") > 0
+
+    now[0] += 61
+    assert limiter.penalize("login-failures:x") == 0
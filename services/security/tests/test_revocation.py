@@ -0,0 +1,68 @@
+import pytest
+import time
+from services.security.tests.conftest import USER_PASSWORD, grant, login
+from services.security.utils import tokens
+from services.security.utils.backends import load_backend
+
+class SharedRevocations(tokens.RevocationBackend):
+    revoked: set = set()
+
+    def revoke(self, user_id: int, ttl: float):
+        self.revoked.add(user_id)
+
+    def revoked_at(self, user_id: int) -> float | None:
+        return float("inf") if user_id in self.revoked else None
+
+def ungrant(user_id: int):
+    from sqlalchemy import delete
+    from services.security.config.database import SessionLocal
+    from services.security.models.user_has_permissions import UserHasPermissions
+
+    with SessionLocal() as db:
+        db.execute(delete(UserHasPermissions).where(UserHasPermissions.user_id == user_id))
+        db.commit()
+
+def test_deleted_user_token_is_rejected_in_stateless_mode(client, admin_headers, make_user, monkeypatch):
+    from services.security.utils import security
+
+    monkeypatch.setattr(security, "STATELESS_AUTH", True)
+    user = make_user()
+    grant(user.id, "view users")
+    headers = login(client, str(user.phone), USER_PASSWORD)
+    assert client.get("/api/v1/users", headers=headers).status_code == 200
+
+    ungrant(user.id)
+    assert client.delete(f"/api/v1/users/{user.id}", headers=admin_headers).status_code == 200
+    assert client.get("/api/v1/users", headers=headers).status_code == 403
+
+def test_revocation_only_applies_to_tokens_issued_before_it(client, make_user):
+    from services.security.utils.tokens import decode_token
+
+    user = make_user()
+    stale = decode_token(login(client, str(user.phone), USER_PASSWORD)["Authorization"].split()[1])
+    tokens.revoke_user(user.id)
+    assert tokens.is_revoked(user.id, stale["iat"])
+    assert not tokens.is_revoked(user.id, time.time() + 1)
+    assert tokens.is_revoked(user.id, None)
+
+def test_memory_revocations_expire(monkeypatch):
+    revocations = tokens.MemoryRevocationList()
+    now = [1000.0]
+    monkeypatch.setattr(tokens.time, "time", lambda: now[0])
+    revocations.revoke(7, ttl=60)
+    assert revocations.revoked_at(7) == 1000.0
+    now[0] += 61
+    assert revocations.revoked_at(7) is None
+
+def test_backend_is_pluggable():
+    assert isinstance(load_backend(f"{__name__}:SharedRevocations", tokens.MemoryRevocationList), SharedRevocations)
+    assert isinstance(load_backend(None, tokens.MemoryRevocationList), tokens.MemoryRevocationList)
+
+def test_stateless_auth_requires_a_shared_backend(monkeypatch):
+    monkeypatch.setattr(tokens, "STATELESS_AUTH", True)
+    monkeypatch.setattr(tokens, "REVOCATION_BACKEND", None)
+    with pytest.raises(RuntimeError):
+        tokens.check_stateless_auth()
+
+    monkeypatch.setattr(tokens, "REVOCATION_BACKEND", f"{__name__}:SharedRevocations")
+    tokens.check_stateless_auth()
@@ -0,0 +1,45 @@
+from sqlalchemy import select
+import json
+
+def user_passwords() -> dict:
+    from services.security.config.database import SessionLocal
+    from services.security.models.user import User
+
+    with SessionLocal() as db:
+        return dict(db.execute(select(User.email, User.password)).all())
+
+def test_second_seed_is_a_no_op(app, monkeypatch):
+    from services.security.config.database import SessionLocal
+    from services.security.models.seed_version import SeedVersion
+    from services.security.seeders import seed
+
+    with SessionLocal() as db:
+        assert set(db.scalars(select(SeedVersion.file))) >= {file for file, *_ in seed.SEEDS}
+
+    calls = []
+    monkeypatch.setattr(seed, "upsert", lambda *args: calls.append("upsert"))
+    monkeypatch.setattr(seed, "hash_passwords", lambda passwords: calls.append("hash") or passwords)
+    before = user_passwords()
+    seed.seed()
+    assert calls == []
+    assert user_passwords() == before
+
+def test_changed_users_file_only_hashes_new_users(app, monkeypatch, tmp_path):
+    from services.security.seeders import seed
+    from services.security.models.user import User
+
+    rows = json.loads((seed.DATA_PATH / "users.json").read_text())
+    rows.append({**rows[0], "code": "seed-new", "email": "seed-new@example.com", "phone": 820000000, "password": "new-password"})
+    path = tmp_path / "users.json"
+    path.write_text(json.dumps(rows))
+
+    hashed = []
+    hash_passwords = seed.hash_passwords
+    monkeypatch.setattr(seed, "hash_passwords", lambda passwords: hashed.extend(passwords) or hash_passwords(passwords))
+    before = user_passwords()
+    seed.seed_model(str(path), User, ["email"])
+
+    assert hashed == ["new-password"]
+    after = user_passwords()
+    assert {email: after[email] for email in before} == before
+    assert "seed-new@example.com" in after
@@ -0,0 +1,53 @@
+import hashlib
+import io
+import os
+import pytest
+from PIL import Image
+from services.security.utils import thumbnails
+
+@pytest.fixture
+def original():
+    buffer = io.BytesIO()
+    Image.new("RGB", (300, 200), (10, 200, 30)).save(buffer, format="PNG")
+    content = buffer.getvalue()
+    digest = hashlib.sha256(content).hexdigest()
+    os.makedirs(thumbnails.avatars_directory(), exist_ok=True)
+    path = os.path.join(thumbnails.avatars_directory(), f"{digest}.png")
+    with open(path, "wb") as file:
+        file.write(content)
+    yield digest
+    for name in os.listdir(thumbnails.avatars_directory()):
+        if name.startswith(digest):
+            os.remove(os.path.join(thumbnails.avatars_directory(), name))
+
+def thumbnail_files(digest: str) -> list:
+    return sorted(name for name in os.listdir(thumbnails.avatars_directory()) if name.startswith(f"{digest}_"))
+
+def test_all_variants_are_rendered_from_a_single_decode(original, monkeypatch):
+    opened = []
+    real_open = Image.open
+    monkeypatch.setattr(Image, "open", lambda *args, **kwargs: opened.append(args) or real_open(*args, **kwargs))
+    thumbnails.generate_thumbnails(os.path.join("static", "avatars", f"{original}.png"))
+    assert len(opened) == 1
+    assert len(thumbnail_files(original)) == len(thumbnails.THUMBNAIL_SIZES) * len(thumbnails.THUMBNAIL_FORMATS)
+
+def test_budget_counts_thumbnails_written_by_other_workers(original, monkeypatch):
+    foreign = os.path.join(thumbnails.avatars_directory(), "0" * 64 + "_64.jpg")
+    with open(foreign, "wb") as file:
+        file.write(b"\0" * 4096)
+    os.utime(foreign, (1, 1))
+    monkeypatch.setattr(thumbnails, "THUMBNAIL_CACHE_BYTES", 2048)
+    try:
+        assert thumbnails.ensure_thumbnail(f"{original}_64.jpg") is not None
+        assert not os.path.exists(foreign)
+        assert thumbnail_files(original) == [f"{original}_64.jpg"]
+    finally:
+        if os.path.exists(foreign):
+            os.remove(foreign)
+
+def test_oversized_originals_are_not_decoded(original, monkeypatch):
+    monkeypatch.setattr(thumbnails, "THUMBNAIL_MAX_PIXELS", 100)
+    with pytest.raises(ValueError):
+        thumbnails.ensure_thumbnail(f"{original}_64.jpg")
+    thumbnails.generate_thumbnails(os.path.join("static", "avatars", f"{original}.png"))
+    assert thumbnail_files(original) == []
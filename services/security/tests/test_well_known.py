@@ -0,0 +1,17 @@
+def test_jwks_is_served_with_an_etag(client):
+    response = client.get("/.well-known/jwks.json")
+    assert response.status_code == 200
+    etag = response.headers["etag"]
+    assert "max-age" in response.headers["cache-control"]
+
+    cached = client.get("/.well-known/jwks.json", headers={"If-None-Match": etag})
+    assert cached.status_code == 304
+    assert cached.content == b"" and cached.headers["etag"] == etag
+    assert client.get("/.well-known/jwks.json", headers={"If-None-Match": '"stale"'}).status_code == 200
+
+def test_scopes_document_is_served_with_an_etag(client):
+    response = client.get("/.well-known/scopes.json")
+    assert response.status_code == 200
+    assert response.json()["scopes"]["introspect tokens"] == 15
+    cached = client.get("/.well-known/scopes.json", headers={"If-None-Match": response.headers["etag"]})
+    assert cached.status_code == 304
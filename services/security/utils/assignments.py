@@ -0,0 +1,42 @@
+from sqlalchemy import insert, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Any, Iterable
+
+def insert_ignore(db: AsyncSession, model: Any):
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        return postgresql.insert(model).on_conflict_do_nothing()
+    if dialect == "sqlite":
+        return sqlite.insert(model).on_conflict_do_nothing()
+    return insert(model)
+
+async def assign_links(
+        db: AsyncSession,
+        link_model: Any,
+        owner_column: str,
+        owner_id: int,
+        target_column: str,
+        target_model: Any,
+        target_ids: Iterable[int]
+) -> dict:
+    requested = set(target_ids)
+    found = set(await db.scalars(select(target_model.id).where(target_model.id.in_(requested)))) if requested else set()
+    linked = set(await db.scalars(
+        select(getattr(link_model, target_column)).where(
+            getattr(link_model, owner_column) == owner_id,
+            getattr(link_model, target_column).in_(found)
+        )
+    )) if found else set()
+    missing = found - linked
+
+    if missing:
+        await db.execute(
+            insert_ignore(db, link_model),
+            [{owner_column: owner_id, target_column: target_id} for target_id in sorted(missing)]
+        )
+    await db.commit()
+    return {
+        "inserted": len(missing),
+        "skipped": len(requested) - len(missing)
+    }
@@ -0,0 +1,10 @@
+from importlib import import_module
+from typing import Callable, TypeVar
+
+Backend = TypeVar("Backend")
+
+def load_backend(path: str | None, default: Callable[[], Backend]) -> Backend:
+    if not path:
+        return default()
+    module_name, _, attribute = path.partition(":")
+    return getattr(import_module(module_name), attribute)()
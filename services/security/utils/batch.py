@@ -0,0 +1,61 @@
+from fastapi import HTTPException, status
+from pydantic import BaseModel
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from services.security.utils.cache import get_cached, set_cached
+from services.security.utils.serialization import projection, rows_to_dicts
+from typing import Any, Iterable, List, Type
+import os
+
+BATCH_MAX_IDS = int(os.getenv("BATCH_MAX_IDS", "200"))
+
+def parse_ids(raw: str) -> List[int]:
+    try:
+        return [int(value) for value in raw.split(",") if value.strip()]
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Los ids deben ser numeros enteros separados por comas"
+        )
+
+def unique_ids(ids: Iterable[int]) -> List[int]:
+    ids = list(dict.fromkeys(ids))
+    if not ids:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Debe enviar al menos un id"
+        )
+    if len(ids) > BATCH_MAX_IDS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Se permiten como maximo {BATCH_MAX_IDS} ids por consulta"
+        )
+    return ids
+
+async def fetch_by_ids(
+        db: AsyncSession,
+        model: Any,
+        schema: Type[BaseModel],
+        kind: str,
+        ids: Iterable[int]
+) -> dict:
+    ids = unique_ids(ids)
+    found = {}
+    pending = []
+    for id in ids:
+        cached = get_cached(kind, id)
+        if cached is None:
+            pending.append(id)
+        else:
+            found[id] = cached
+
+    if pending:
+        rows = await db.execute(select(*projection(model, schema)).where(model.id.in_(pending)))
+        for payload in rows_to_dicts(schema, rows):
+            set_cached(kind, payload["id"], payload)
+            found[payload["id"]] = payload
+
+    return {
+        "data": {str(id): found.get(id) for id in ids},
+        "not_found": [id for id in ids if id not in found]
+    }
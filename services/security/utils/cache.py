@@ -0,0 +1,106 @@
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any
+from services.security.utils.backends import load_backend
+import os
+import threading
+import time
+
+ENTITY_CACHE_TTL = float(os.getenv("ENTITY_CACHE_TTL", "30"))
+ENTITY_CACHE_SIZE = int(os.getenv("ENTITY_CACHE_SIZE", "10000"))
+ENTITY_CACHE_BACKEND = os.getenv("ENTITY_CACHE_BACKEND")
+
+class CacheBackend(ABC):
+    @abstractmethod
+    def get(self, key: str) -> Any | None:
+        ...
+
+    @abstractmethod
+    def set(self, key: str, value: Any):
+        ...
+
+    @abstractmethod
+    def delete(self, *keys: str):
+        ...
+
+    @abstractmethod
+    def delete_prefix(self, prefix: str):
+        ...
+
+    def stats(self) -> dict:
+        return {}
+
+class MemoryCache(CacheBackend):
+    def __init__(self, ttl: float = ENTITY_CACHE_TTL, max_size: int = ENTITY_CACHE_SIZE):
+        self.ttl = ttl
+        self.max_size = max_size
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, tuple[float, Any]]" = OrderedDict()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    def get(self, key: str) -> Any | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] < time.monotonic():
+                if entry is not None:
+                    del self._entries[key]
+                self._misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return entry[1]
+
+    def set(self, key: str, value: Any):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self._evictions += 1
+
+    def delete(self, *keys: str):
+        with self._lock:
+            for key in keys:
+                self._entries.pop(key, None)
+
+    def delete_prefix(self, prefix: str):
+        with self._lock:
+            for key in [key for key in self._entries if key.startswith(prefix)]:
+                del self._entries[key]
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "size": len(self._entries),
+                "hits": self._hits,
+                "misses": self._misses,
+                "evictions": self._evictions,
+                "hit_ratio": self._hits / lookups if lookups else 0.0,
+            }
+
+entity_cache: CacheBackend = load_backend(ENTITY_CACHE_BACKEND, MemoryCache)
+
+def set_entity_cache(backend: CacheBackend):
+    global entity_cache
+    entity_cache = backend
+
+def get_entity_cache() -> CacheBackend:
+    return entity_cache
+
+def entity_key(kind: str, id: int) -> str:
+    return f"{kind}:{id}"
+
+def get_cached(kind: str, id: int) -> Any | None:
+    return entity_cache.get(entity_key(kind, id))
+
+def set_cached(kind: str, id: int, payload: Any):
+    entity_cache.set(entity_key(kind, id), payload)
+
+def invalidate(kind: str, *ids: int):
+    entity_cache.delete(*(entity_key(kind, id) for id in ids))
+
+def invalidate_all(kind: str):
+    entity_cache.delete_prefix(f"{kind}:")
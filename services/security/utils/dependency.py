@@ -1,9 +1,12 @@
-from sqlalchemy.orm import Session
-from services.security.config.database import SessionLocal
+from fastapi import Request
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import AsyncIterator
+from services.security.config.database import AsyncSessionLocal
 
-def get_db() -> Session:
-    db = SessionLocal()
-    try:
+async def get_db(request: Request) -> AsyncIterator[AsyncSession]:
+    if hasattr(request.state, "db"):
+        yield request.state.db
+        return
+    async with AsyncSessionLocal() as db:
+        request.state.db = db
         yield db
-    finally:
-        db.close()
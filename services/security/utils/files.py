@@ -1,20 +1,164 @@
-from fastapi import UploadFile, HTTPException
+from fastapi import UploadFile, HTTPException, status
+from fastapi.responses import JSONResponse
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import Headers
+from services.security.models.user import User
+from typing import Tuple
+import asyncio
+import hashlib
+import mimetypes
+import glob
 import os
-import shutil
+import re
+import tempfile
+import weakref
 
-def save_avatar_file(avatar: UploadFile, name: str, last_name: str, code: str) -> str:
-    if not avatar.content_type.startswith("image/"):
+BASE_PATH = os.path.join("services", "security")
+AVATARS_PATH = os.path.join("static", "avatars")
+AVATAR_CHUNK_SIZE = 64 * 1024
+AVATAR_MAX_BYTES = int(os.getenv("AVATAR_MAX_BYTES", str(5 * 1024 * 1024)))
+AVATAR_REDIRECT_MAX_AGE = int(os.getenv("AVATAR_REDIRECT_MAX_AGE", "60"))
+UPLOAD_MAX_BYTES = int(os.getenv("UPLOAD_MAX_BYTES", str(AVATAR_MAX_BYTES + 64 * 1024)))
+
+IMAGE_SIGNATURES = (
+    (b"\x89PNG\r\n\x1a\n", "image/png", "png"),
+    (b"\xff\xd8\xff", "image/jpeg", "jpg"),
+    (b"GIF87a", "image/gif", "gif"),
+    (b"GIF89a", "image/gif", "gif"),
+)
+CONTENT_ADDRESSED = re.compile(r"^[0-9a-f]{64}(_\d+)?\.(png|jpg|gif|webp)$")
+
+_avatar_locks: "weakref.WeakValueDictionary[str, asyncio.Lock]" = weakref.WeakValueDictionary()
+
+def sniff_image_type(header: bytes) -> Tuple[str, str] | None:
+    for signature, media_type, extension in IMAGE_SIGNATURES:
+        if header.startswith(signature):
+            return media_type, extension
+    if header[:4] == b"RIFF" and header[8:12] == b"WEBP":
+        return "image/webp", "webp"
+    return None
+
+def avatar_lock(relative_path: str) -> asyncio.Lock:
+    lock = _avatar_locks.get(relative_path)
+    if lock is None:
+        lock = _avatar_locks[relative_path] = asyncio.Lock()
+    return lock
+
+def avatar_too_large() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+        detail=f"El avatar no puede superar los {AVATAR_MAX_BYTES} bytes"
+    )
+
+def upload_too_large() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+        detail=f"El formulario no puede superar los {UPLOAD_MAX_BYTES} bytes"
+    )
+
+class UploadLimitMiddleware:
+    def __init__(self, app, max_bytes: int = UPLOAD_MAX_BYTES):
+        self.app = app
+        self.max_bytes = max_bytes
+
+    async def __call__(self, scope, receive, send):
+        headers = Headers(scope=scope) if scope["type"] == "http" else None
+        if headers is None or not headers.get("content-type", "").startswith("multipart/form-data"):
+            await self.app(scope, receive, send)
+            return
+
+        content_length = headers.get("content-length", "")
+        if content_length.isdigit() and int(content_length) > self.max_bytes:
+            error = upload_too_large()
+            response = JSONResponse({"detail": error.detail}, status_code=error.status_code)
+            await response(scope, receive, send)
+            return
+
+        received = 0
+
+        async def limited_receive():
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > self.max_bytes:
+                    raise upload_too_large()
+            return message
+
+        await self.app(scope, limited_receive, send)
+
+async def save_avatar_file(avatar: UploadFile) -> Tuple[str, str]:
+    if avatar.size is not None and avatar.size > AVATAR_MAX_BYTES:
+        raise avatar_too_large()
+
+    await avatar.seek(0)
+    chunk = await avatar.read(AVATAR_CHUNK_SIZE)
+    image_type = sniff_image_type(chunk[:16])
+    if image_type is None:
         raise HTTPException(status_code=400, detail="El archivo no es una imagen válida")
 
-    file_extension = avatar.filename.split(".")[-1]
-    filename = f"{name}_{last_name}_{code}.{file_extension}".replace(" ", "_")
-    relative_path = os.path.join("static", "avatars", filename)
-    absolute_path = os.path.join("services", "security", relative_path)
+    avatars_directory = os.path.join(BASE_PATH, AVATARS_PATH)
+    os.makedirs(avatars_directory, exist_ok=True)
+    descriptor, temporary_path = tempfile.mkstemp(dir=avatars_directory, prefix=".upload-")
+    try:
+        digest = hashlib.sha256()
+        size = 0
+        with os.fdopen(descriptor, "wb") as buffer:
+            while chunk:
+                size += len(chunk)
+                if size > AVATAR_MAX_BYTES:
+                    raise avatar_too_large()
+                digest.update(chunk)
+                await run_in_threadpool(buffer.write, chunk)
+                chunk = await avatar.read(AVATAR_CHUNK_SIZE)
 
+        return os.path.join(AVATARS_PATH, f"{digest.hexdigest()}.{image_type[1]}"), temporary_path
+    except BaseException:
+        discard_avatar_file(temporary_path)
+        raise
+
+def publish_avatar_file(relative_path: str, temporary_path: str) -> bool:
+    absolute_path = os.path.join(BASE_PATH, relative_path)
     if os.path.exists(absolute_path):
-        os.remove(absolute_path)
+        os.remove(temporary_path)
+        return False
+    os.chmod(temporary_path, 0o644)
+    os.replace(temporary_path, absolute_path)
+    return True
+
+def discard_avatar_file(temporary_path: str | None):
+    if temporary_path and os.path.exists(temporary_path):
+        os.remove(temporary_path)
+
+def avatar_etag(relative_path: str) -> str | None:
+    filename = os.path.basename(relative_path)
+    if not CONTENT_ADDRESSED.match(filename):
+        return None
+    return f'"{filename.replace(".", "-")}"'
+
+def avatar_path(relative_path: str | None) -> str | None:
+    if not relative_path:
+        return None
+    avatars_directory = os.path.realpath(os.path.join(BASE_PATH, AVATARS_PATH))
+    absolute_path = os.path.realpath(os.path.join(BASE_PATH, relative_path))
+    if os.path.dirname(absolute_path) != avatars_directory:
+        return None
+    return absolute_path
 
-    with open(absolute_path, "wb") as buffer:
-        shutil.copyfileobj(avatar.file, buffer)
+def avatar_media_type(relative_path: str) -> str:
+    return mimetypes.guess_type(relative_path)[0] or "application/octet-stream"
 
-    return relative_path
+async def remove_avatar_if_unused(db: AsyncSession, relative_path: str | None):
+    absolute_path = avatar_path(relative_path)
+    if absolute_path is None:
+        return
+    async with avatar_lock(relative_path):
+        references = await db.scalar(select(func.count()).select_from(User).where(User.avatar == relative_path))
+        if references == 0 and os.path.exists(absolute_path):
+            os.remove(absolute_path)
+            digest = os.path.basename(relative_path).split(".")[0]
+            if CONTENT_ADDRESSED.match(os.path.basename(relative_path)):
+                for variant in glob.glob(os.path.join(os.path.dirname(absolute_path), f"{digest}_*")):
+                    os.remove(variant)
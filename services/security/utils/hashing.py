@@ -0,0 +1,130 @@
+from concurrent.futures import ProcessPoolExecutor
+from fastapi import HTTPException, status
+from typing import List
+import asyncio
+import logging
+import multiprocessing
+import os
+import threading
+import time
+
+HASH_WORKERS = int(os.getenv("HASH_WORKERS", str(os.cpu_count() or 1)))
+HASH_QUEUE_SIZE = int(os.getenv("HASH_QUEUE_SIZE", str(HASH_WORKERS * 4)))
+HASH_BATCH_CONCURRENCY = int(os.getenv("HASH_BATCH_CONCURRENCY", str(HASH_WORKERS)))
+HASH_WARMUP = os.getenv("HASH_WARMUP", "True").lower() == "true"
+WARMUP_HOLD_SECONDS = 0.05
+
+_lock = threading.Lock()
+_context = None
+_executor: ProcessPoolExecutor | None = None
+_pending = 0
+_stats = {"completed": 0, "rejected": 0, "seconds_total": 0.0, "seconds_max": 0.0}
+
+def get_context():
+    global _context
+    if _context is None:
+        from passlib.context import CryptContext
+        _context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+    return _context
+
+def _hash(password: str) -> str:
+    return get_context().hash(password)
+
+def _verify(plain_password: str, hashed_password: str) -> bool:
+    return get_context().verify(plain_password, hashed_password)
+
+def _warm() -> int:
+    get_context().handler("bcrypt").get_backend()
+    time.sleep(WARMUP_HOLD_SECONDS)
+    return os.getpid()
+
+def _timed(fn, *args):
+    started = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - started
+
+def get_executor() -> ProcessPoolExecutor:
+    global _executor
+    with _lock:
+        if _executor is None:
+            _executor = ProcessPoolExecutor(
+                max_workers=HASH_WORKERS,
+                mp_context=multiprocessing.get_context("spawn")
+            )
+        return _executor
+
+async def warm_executor() -> int:
+    if not HASH_WARMUP:
+        return 0
+    executor = get_executor()
+    loop = asyncio.get_running_loop()
+    workers = len(set(await asyncio.gather(*(loop.run_in_executor(executor, _warm) for _ in range(HASH_WORKERS)))))
+    logging.info(f"Pool de hashing precalentado con {workers} procesos")
+    return workers
+
+def shutdown_executor():
+    global _executor
+    with _lock:
+        if _executor is not None:
+            _executor.shutdown(wait=False, cancel_futures=True)
+            _executor = None
+
+async def _submit(fn, *args):
+    global _pending
+    with _lock:
+        if _pending >= HASH_WORKERS + HASH_QUEUE_SIZE:
+            _stats["rejected"] += 1
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="El servicio esta saturado, intente nuevamente en unos segundos",
+                headers={"Retry-After": "1"}
+            )
+        _pending += 1
+    from services.security.utils.metrics import observe_stage
+    started = time.perf_counter()
+    try:
+        result, worker_seconds = await asyncio.get_running_loop().run_in_executor(get_executor(), _timed, fn, *args)
+        observe_stage("bcrypt", worker_seconds)
+        observe_stage("bcrypt_queue", time.perf_counter() - started - worker_seconds)
+        return result
+    finally:
+        elapsed = time.perf_counter() - started
+        with _lock:
+            _pending -= 1
+            _stats["completed"] += 1
+            _stats["seconds_total"] += elapsed
+            _stats["seconds_max"] = max(_stats["seconds_max"], elapsed)
+
+async def hash_password(password: str) -> str:
+    return await _submit(_hash, password)
+
+async def verify_password(plain_password: str, hashed_password: str) -> bool:
+    return await _submit(_verify, plain_password, hashed_password)
+
+async def hash_many(passwords: List[str]) -> List[str]:
+    results: List[str] = [""] * len(passwords)
+    pending = iter(range(len(passwords)))
+
+    async def worker():
+        try:
+            for index in pending:
+                results[index] = await _submit(_hash, passwords[index])
+        except BaseException:
+            for _ in pending:
+                pass
+            raise
+
+    await asyncio.gather(*(worker() for _ in range(min(HASH_BATCH_CONCURRENCY, len(passwords)))))
+    return results
+
+def hash_passwords(passwords: List[str]) -> List[str]:
+    return list(get_executor().map(_hash, passwords))
+
+def get_hashing_stats() -> dict:
+    with _lock:
+        return {
+            "workers": HASH_WORKERS,
+            "queue_size": HASH_QUEUE_SIZE,
+            "pending": _pending,
+            **_stats,
+        }
@@ -0,0 +1,62 @@
+from fastapi import HTTPException, status
+from jwt.exceptions import InvalidTokenError
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.concurrency import run_in_threadpool
+from services.security.models.user import User
+from services.security.utils.role_permissions import get_role_permissions
+from services.security.utils.scopes import decode_mask, get_scope_registry, mask_to_scopes
+from services.security.utils.tokens import decode_token, is_revoked, STATELESS_AUTH
+from typing import Dict, List
+import binascii
+import os
+
+INTROSPECT_MAX_TOKENS = int(os.getenv("INTROSPECT_MAX_TOKENS", "500"))
+
+def decode_tokens(tokens: List[str]) -> Dict[str, dict | None]:
+    payloads = {}
+    for token in tokens:
+        try:
+            payload = decode_token(token, memoize=False)
+            if "perms" in payload:
+                payload = {**payload, "mask": decode_mask(payload["perms"])}
+            payloads[token] = payload
+        except (InvalidTokenError, binascii.Error, TypeError):
+            payloads[token] = None
+    return payloads
+
+async def introspect_tokens(tokens: List[str], required: List[str], db: AsyncSession) -> List[dict]:
+    if len(tokens) > INTROSPECT_MAX_TOKENS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Se permiten como maximo {INTROSPECT_MAX_TOKENS} tokens por consulta"
+        )
+    payloads = await run_in_threadpool(decode_tokens, list(dict.fromkeys(tokens)))
+
+    user_ids = {payload.get("id") for payload in payloads.values() if payload is not None}
+    if not STATELESS_AUTH and user_ids:
+        user_ids = set(await db.scalars(select(User.id).where(User.id.in_(user_ids))))
+
+    registry = None
+    if any(payload is not None and "mask" in payload for payload in payloads.values()):
+        registry = await get_scope_registry(db)
+
+    results = {}
+    for token, payload in payloads.items():
+        if payload is None or payload.get("id") not in user_ids or is_revoked(payload.get("id"), payload.get("iat")):
+            results[token] = {"active": False}
+            continue
+        if "mask" in payload:
+            scopes = mask_to_scopes(payload["mask"], registry)
+        else:
+            scopes = sorted(await get_role_permissions(payload.get("roles", []), db) | set(payload.get("scopes", [])))
+        results[token] = {
+            "active": True,
+            "sub": payload.get("sub"),
+            "id": payload.get("id"),
+            "exp": payload.get("exp"),
+            "roles": payload.get("roles", []),
+            "scopes": scopes,
+            "allowed": set(required) <= set(scopes),
+        }
+    return [results[token] for token in tokens]
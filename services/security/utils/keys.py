@@ -0,0 +1,103 @@
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ec, ed25519
+from jwt.algorithms import ECAlgorithm, OKPAlgorithm
+from jwt.exceptions import InvalidKeyError, InvalidTokenError
+from typing import Any, Dict, List, NamedTuple, Tuple
+import os
+import threading
+import time
+
+SECRET_KEY = os.getenv("SECRET_KEY")
+ALGORITHM = os.getenv("ALGORITHM")
+JWT_KEYS_PATH = os.getenv("JWT_KEYS_PATH", os.path.join("services", "security", "keys"))
+JWT_ACTIVE_KID = os.getenv("JWT_ACTIVE_KID")
+ASYMMETRIC_ALGORITHMS = ("EdDSA", "ES256")
+KEYS_MIN_RELOAD = 5.0
+
+class SigningKey(NamedTuple):
+    kid: str
+    algorithm: str
+    private_key: Any
+    public_key: Any
+
+_lock = threading.Lock()
+_keys: Dict[str, SigningKey] | None = None
+_loaded_at: float = 0.0
+
+def is_asymmetric() -> bool:
+    return ALGORITHM in ASYMMETRIC_ALGORITHMS
+
+def key_algorithm(private_key: Any) -> str:
+    if isinstance(private_key, ed25519.Ed25519PrivateKey):
+        return "EdDSA"
+    if isinstance(private_key, ec.EllipticCurvePrivateKey) and isinstance(private_key.curve, ec.SECP256R1):
+        return "ES256"
+    raise InvalidKeyError("Solo se admiten claves Ed25519 o EC P-256")
+
+def load_keys() -> Dict[str, SigningKey]:
+    global _keys, _loaded_at
+    keys = {}
+    if os.path.isdir(JWT_KEYS_PATH):
+        for filename in sorted(os.listdir(JWT_KEYS_PATH)):
+            if not filename.endswith(".pem"):
+                continue
+            with open(os.path.join(JWT_KEYS_PATH, filename), "rb") as file:
+                private_key = serialization.load_pem_private_key(file.read(), password=None)
+            kid = filename[:-len(".pem")]
+            keys[kid] = SigningKey(kid, key_algorithm(private_key), private_key, private_key.public_key())
+    with _lock:
+        _keys = keys
+        _loaded_at = time.monotonic()
+    return keys
+
+def get_keys() -> Dict[str, SigningKey]:
+    keys = _keys
+    if keys is None:
+        keys = load_keys()
+    return keys
+
+def signing_key() -> SigningKey:
+    keys = get_keys()
+    kid = JWT_ACTIVE_KID or (next(reversed(keys)) if keys else None)
+    if kid not in keys:
+        raise InvalidKeyError(f"No existe la clave de firma {kid} en {JWT_KEYS_PATH}")
+    return keys[kid]
+
+def verification_key(kid: str | None) -> Tuple[Any, List[str]]:
+    if not is_asymmetric():
+        return SECRET_KEY, [ALGORITHM]
+    keys = get_keys()
+    if kid not in keys and time.monotonic() - _loaded_at > KEYS_MIN_RELOAD:
+        keys = load_keys()
+    if kid not in keys:
+        raise InvalidTokenError(f"La clave {kid} no es valida")
+    return keys[kid].public_key, [keys[kid].algorithm]
+
+def jwks() -> dict:
+    if not is_asymmetric():
+        return {"keys": []}
+    published = []
+    for key in get_keys().values():
+        algorithm = OKPAlgorithm if key.algorithm == "EdDSA" else ECAlgorithm
+        jwk = algorithm.to_jwk(key.public_key, as_dict=True)
+        jwk.update({"kid": key.kid, "alg": key.algorithm, "use": "sig"})
+        published.append(jwk)
+    return {"keys": published}
+
+def generate_key(algorithm: str, kid: str) -> str:
+    if algorithm == "EdDSA":
+        private_key = ed25519.Ed25519PrivateKey.generate()
+    elif algorithm == "ES256":
+        private_key = ec.generate_private_key(ec.SECP256R1())
+    else:
+        raise ValueError(f"Algoritmo no soportado: {algorithm}")
+    os.makedirs(JWT_KEYS_PATH, exist_ok=True)
+    path = os.path.join(JWT_KEYS_PATH, f"{kid}.pem")
+    descriptor = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+    with os.fdopen(descriptor, "wb") as file:
+        file.write(private_key.private_bytes(
+            serialization.Encoding.PEM,
+            serialization.PrivateFormat.PKCS8,
+            serialization.NoEncryption()
+        ))
+    return path
@@ -0,0 +1,182 @@
+from bisect import bisect_left
+from contextvars import ContextVar
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from typing import Dict, Iterable, List, Tuple
+import os
+import threading
+import time
+
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "False").lower() == "true"
+LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100)
+MONOTONIC_STATS = {
+    "completed", "rejected", "seconds_total", "allowed", "rejected_ip", "rejected_phone", "rejected_backoff",
+    "failures", "hits", "misses", "evictions",
+}
+
+Labels = Tuple[Tuple[str, str], ...]
+
+class Histogram:
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets: Tuple[float, ...]):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+HELP = {
+    "http_request_duration_seconds": "Duracion de las peticiones HTTP por ruta y estado",
+    "http_request_sql_statements": "Sentencias SQL ejecutadas por peticion",
+    "http_request_sql_seconds": "Tiempo en SQL por peticion",
+    "security_stage_seconds": "Duracion de las etapas internas (bcrypt, jwt, authz)",
+    "db_pool_timeouts_total": "Esperas por una conexion del pool que agotaron el tiempo",
+    "db_pool_checkouts_total": "Conexiones entregadas por el pool",
+    "db_pool_connections_total": "Conexiones nuevas abiertas contra la base de datos",
+}
+
+_lock = threading.Lock()
+_histograms: Dict[str, Dict[Labels, Histogram]] = {}
+_counters: Dict[str, Dict[Labels, float]] = {}
+_request_sql: ContextVar[List[float] | None] = ContextVar("request_sql", default=None)
+_instrumented_engines: set = set()
+
+def observe(name: str, labels: Labels, value: float, buckets: Tuple[float, ...] = LATENCY_BUCKETS):
+    with _lock:
+        series = _histograms.setdefault(name, {})
+        histogram = series.get(labels)
+        if histogram is None:
+            histogram = series[labels] = Histogram(buckets)
+        histogram.observe(value)
+
+def increment(name: str, labels: Labels, value: float = 1):
+    with _lock:
+        series = _counters.setdefault(name, {})
+        series[labels] = series.get(labels, 0) + value
+
+def observe_stage(stage: str, seconds: float):
+    observe("security_stage_seconds", (("stage", stage),), seconds)
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info["query_started"].pop()
+    sql = _request_sql.get()
+    if sql is not None:
+        sql[0] += 1
+        sql[1] += elapsed
+
+def instrument_engine(engine: Engine, engine_name: str):
+    if id(engine) in _instrumented_engines:
+        return
+    _instrumented_engines.add(id(engine))
+    labels = (("engine", engine_name),)
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(engine, "checkout", lambda *args: increment("db_pool_checkouts_total", labels))
+    event.listen(engine, "connect", lambda *args: increment("db_pool_connections_total", labels))
+
+class MetricsMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        status_code = 500
+        sql = [0, 0.0]
+        token = _request_sql.set(sql)
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _request_sql.reset(token)
+            route = (("method", scope["method"]), ("route", getattr(scope.get("route"), "path", "unmatched")))
+            observe("http_request_duration_seconds", route + (("status", str(status_code)),), time.perf_counter() - started)
+            observe("http_request_sql_statements", route, sql[0], COUNT_BUCKETS)
+            observe("http_request_sql_seconds", route, sql[1])
+
+def _format_labels(labels: Iterable[Tuple[str, str]]) -> str:
+    pairs = []
+    for key, value in labels:
+        value = str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+        pairs.append(f'{key}="{value}"')
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+def _sample(gauges: Dict[str, Dict[Labels, float]], counters: Dict[str, Dict[Labels, float]],
+            prefix: str, stats: dict, labels: Labels = ()):
+    for key, value in stats.items():
+        if key in MONOTONIC_STATS:
+            name = f"{prefix}{key}" if key.endswith("_total") else f"{prefix}{key}_total"
+            counters.setdefault(name, {})[labels] = value
+        else:
+            gauges.setdefault(f"{prefix}{key}", {})[labels] = value
+
+def _sampled() -> Tuple[Dict[str, Dict[Labels, float]], Dict[str, Dict[Labels, float]]]:
+    from services.security.config.database import engine, async_engine
+    from services.security.utils.cache import get_entity_cache
+    from services.security.utils.hashing import get_hashing_stats
+    from services.security.utils.rate_limit import get_rate_limit_stats
+    from services.security.utils.tokens import get_token_cache_stats
+
+    gauges: Dict[str, Dict[Labels, float]] = {}
+    counters: Dict[str, Dict[Labels, float]] = {}
+    for engine_name, pool in (("sync", engine.pool), ("async", async_engine.sync_engine.pool)):
+        for stat in ("size", "checkedout", "checkedin", "overflow"):
+            if hasattr(pool, stat):
+                gauges.setdefault(f"db_pool_{stat}", {})[(("engine", engine_name),)] = getattr(pool, stat)()
+    _sample(gauges, counters, "hashing_", get_hashing_stats())
+    _sample(gauges, counters, "login_rate_limit_", get_rate_limit_stats())
+    for cache_name, stats in (("entity", get_entity_cache().stats()), ("token", get_token_cache_stats())):
+        _sample(gauges, counters, "cache_", stats, (("cache", cache_name),))
+    return gauges, counters
+
+def render() -> str:
+    lines = []
+    with _lock:
+        histograms = {
+            name: {labels: (h.buckets, list(h.counts), h.sum, h.count) for labels, h in series.items()}
+            for name, series in _histograms.items()
+        }
+        counters = {name: dict(series) for name, series in _counters.items()}
+    gauges, sampled_counters = _sampled()
+    counters.update(sampled_counters)
+    for name, series in sorted(histograms.items()):
+        if name in HELP:
+            lines.append(f"# HELP {name} {HELP[name]}")
+        lines.append(f"# TYPE {name} histogram")
+        for labels, (buckets, counts, total, count) in series.items():
+            cumulative = 0
+            for bound, bucket_count in zip(buckets + (float("inf"),), counts):
+                cumulative += bucket_count
+                le = "+Inf" if bound == float("inf") else repr(float(bound))
+                lines.append(f"{name}_bucket{_format_labels(labels + (('le', le),))} {cumulative}")
+            lines.append(f"{name}_sum{_format_labels(labels)} {total}")
+            lines.append(f"{name}_count{_format_labels(labels)} {count}")
+    for name, series in sorted(counters.items()):
+        if name in HELP:
+            lines.append(f"# HELP {name} {HELP[name]}")
+        lines.append(f"# TYPE {name} counter")
+        for labels, value in series.items():
+            lines.append(f"{name}{_format_labels(labels)} {float(value)}")
+    for name, series in sorted(gauges.items()):
+        lines.append(f"# TYPE {name} gauge")
+        for labels, value in series.items():
+            lines.append(f"{name}{_format_labels(labels)} {float(value)}")
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,45 @@
+from fastapi import HTTPException, status
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Any, List, Tuple
+import base64
+import json
+
+def encode_cursor(last_id: int) -> str:
+    raw = json.dumps({"id": last_id}, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+def decode_cursor(cursor: str) -> int | None:
+    if cursor == "":
+        return None
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        return int(json.loads(base64.urlsafe_b64decode(padded))["id"])
+    except (ValueError, KeyError, TypeError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="El cursor de paginacion no es valido"
+        )
+
+async def keyset_paginate(
+        db: AsyncSession,
+        model: Any,
+        after_id: int | None,
+        size: int,
+        include_total: bool = False,
+        columns: List[Any] | None = None
+) -> Tuple[List[Any], str | None, int | None]:
+    query = (select(*columns) if columns else select(model)).order_by(model.id).limit(size + 1)
+    if after_id is not None:
+        query = query.where(model.id > after_id)
+    items = (await db.execute(query)).all() if columns else (await db.scalars(query)).all()
+
+    next_cursor = None
+    if len(items) > size:
+        items = items[:size]
+        next_cursor = encode_cursor(items[-1].id)
+
+    total = None
+    if include_total:
+        total = await db.scalar(select(func.count()).select_from(model))
+    return items, next_cursor, total
@@ -0,0 +1,30 @@
+from fastapi import HTTPException, Request, status
+from fastapi.responses import ORJSONResponse
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.ext.asyncio import AsyncEngine
+from services.security.utils.metrics import increment
+import asyncio
+import logging
+
+def pool_exhausted() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="No hay conexiones disponibles a la base de datos, intente nuevamente en unos segundos",
+        headers={"Retry-After": "1"}
+    )
+
+async def pool_timeout_handler(request: Request, exc: PoolTimeoutError) -> ORJSONResponse:
+    increment("db_pool_timeouts_total", (("engine", "async"),))
+    logging.warning("Tiempo de espera agotado al obtener una conexion del pool")
+    error = pool_exhausted()
+    return ORJSONResponse({"detail": error.detail}, status_code=error.status_code, headers=error.headers)
+
+async def warm_up(engine: AsyncEngine, connections: int) -> int:
+    size = getattr(engine.sync_engine.pool, "size", None)
+    if size is None or connections <= 0:
+        return 0
+    connections = min(connections, size())
+    opened = await asyncio.gather(*(engine.connect().start() for _ in range(connections)))
+    await asyncio.gather(*(connection.close() for connection in opened))
+    logging.info(f"Pool de conexiones precalentado con {connections} conexiones")
+    return connections
@@ -0,0 +1,123 @@
+from collections import Counter
+from starlette.concurrency import run_in_threadpool
+from typing import List
+import asyncio
+import hmac
+import os
+import random
+import re
+import sys
+import threading
+import time
+import uuid
+
+PROFILER_ENABLED = os.getenv("PROFILER_ENABLED", "False").lower() == "true"
+PROFILE_SAMPLE_RATE = float(os.getenv("PROFILE_SAMPLE_RATE", "0"))
+PROFILE_SECRET = os.getenv("PROFILE_SECRET")
+PROFILE_INTERVAL = float(os.getenv("PROFILE_INTERVAL", "0.005"))
+PROFILE_MAX_FILES = int(os.getenv("PROFILE_MAX_FILES", "50"))
+PROFILES_PATH = os.getenv("PROFILES_PATH", os.path.join("services", "security", "profiles"))
+PROFILE_NAME = re.compile(r"^\d+-[A-Z]+-[\w.-]*-[0-9a-f]{8}\.folded$")
+OTHER_TASKS = "(otras tareas)"
+
+_write_lock = threading.Lock()
+_profiling = threading.Lock()
+
+class StackSampler:
+    def __init__(self, thread_id: int, interval: float = PROFILE_INTERVAL,
+                 loop: asyncio.AbstractEventLoop | None = None, task: asyncio.Task | None = None):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.loop = loop
+        self.task = task
+        self.samples: Counter = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+            if self.task is not None and asyncio.current_task(self.loop) not in (None, self.task):
+                self.samples[OTHER_TASKS] += 1
+            else:
+                self.samples[collapse(frame)] += 1
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+def collapse(frame) -> str:
+    names = []
+    while frame is not None:
+        code = frame.f_code
+        names.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+        frame = frame.f_back
+    return ";".join(reversed(names))
+
+def should_profile(scope: dict) -> bool:
+    if PROFILE_SECRET:
+        for name, value in scope.get("headers", []):
+            if name == b"x-profile":
+                return hmac.compare_digest(value, PROFILE_SECRET.encode())
+    return PROFILE_SAMPLE_RATE > 0 and random.random() < PROFILE_SAMPLE_RATE
+
+def profile_name(method: str, path: str) -> str:
+    slug = re.sub(r"[^\w.-]+", "_", path.strip("/"))[:80]
+    return f"{int(time.time() * 1000)}-{method}-{slug}-{uuid.uuid4().hex[:8]}.folded"
+
+def write_profile(name: str, samples: Counter):
+    os.makedirs(PROFILES_PATH, exist_ok=True)
+    temporary_path = os.path.join(PROFILES_PATH, f".{name}")
+    with open(temporary_path, "w") as file:
+        for stack, count in samples.most_common():
+            file.write(f"{stack} {count}\n")
+    with _write_lock:
+        os.replace(temporary_path, os.path.join(PROFILES_PATH, name))
+        for stale in list_profiles()[PROFILE_MAX_FILES:]:
+            os.remove(os.path.join(PROFILES_PATH, stale["name"]))
+
+def list_profiles() -> List[dict]:
+    if not os.path.isdir(PROFILES_PATH):
+        return []
+    profiles = []
+    for name in os.listdir(PROFILES_PATH):
+        if PROFILE_NAME.match(name):
+            stat = os.stat(os.path.join(PROFILES_PATH, name))
+            profiles.append({"name": name, "size": stat.st_size, "created_at": stat.st_mtime})
+    return sorted(profiles, key=lambda profile: profile["name"], reverse=True)
+
+def profile_path(name: str) -> str | None:
+    path = os.path.join(PROFILES_PATH, name)
+    if not PROFILE_NAME.match(name) or not os.path.exists(path):
+        return None
+    return path
+
+class ProfilerMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not should_profile(scope) or not _profiling.acquire(blocking=False):
+            await self.app(scope, receive, send)
+            return
+
+        name = profile_name(scope["method"], scope["path"])
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                message["headers"] = list(message.get("headers", [])) + [(b"x-profile-id", name.encode())]
+            await send(message)
+
+        sampler = StackSampler(threading.get_ident(), loop=asyncio.get_running_loop(), task=asyncio.current_task())
+        sampler.start()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            sampler.stop()
+            _profiling.release()
+            await run_in_threadpool(write_profile, name, sampler.samples)
@@ -0,0 +1,147 @@
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+import logging
+import os
+import re
+import sys
+import time
+
+SQL_DEBUG = os.getenv("SQL_DEBUG", "False").lower() == "true"
+SLOW_QUERY_SECONDS = float(os.getenv("SLOW_QUERY_SECONDS", "0.2"))
+N_PLUS_ONE_THRESHOLD = int(os.getenv("N_PLUS_ONE_THRESHOLD", "5"))
+QUERY_BUDGET = int(os.getenv("QUERY_BUDGET", "0")) or None
+QUERY_BUDGET_RAISE = os.getenv("QUERY_BUDGET_RAISE", "False").lower() == "true"
+STACK_EXCERPT_DEPTH = 5
+
+PLACEHOLDER = r"(?:\?|\$\d+|%\(\w+\)s|:\w+)"
+PLACEHOLDER_LIST = re.compile(rf"\(\s*{PLACEHOLDER}(?:\s*,\s*{PLACEHOLDER})*\s*\)")
+NUMBERED_PLACEHOLDER = re.compile(r"\$\d+")
+WHITESPACE = re.compile(r"\s+")
+PROJECT_PATH = os.path.join("services", "security")
+IGNORED_FILES = ("query_inspector.py", "metrics.py")
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+class RequestQueries:
+    __slots__ = ("scope", "count", "shapes", "reported")
+
+    def __init__(self, scope: dict):
+        self.scope = scope
+        self.count = 0
+        self.shapes: Counter = Counter()
+        self.reported: set = set()
+
+    @property
+    def route(self) -> str:
+        route = self.scope.get("route")
+        return f"{self.scope.get('method')} {getattr(route, 'path', self.scope.get('path'))}"
+
+_current: ContextVar[RequestQueries | None] = ContextVar("request_queries", default=None)
+_budget_override: int | None = None
+_instrumented_engines: set = set()
+
+def statement_shape(statement: str) -> str:
+    shape = NUMBERED_PLACEHOLDER.sub("?", statement)
+    shape = PLACEHOLDER_LIST.sub("(?)", shape)
+    return WHITESPACE.sub(" ", shape).strip()
+
+def _frames():
+    frame = sys._getframe()
+    while frame is not None:
+        yield frame
+        frame = frame.f_back
+    greenlet = sys.modules.get("greenlet")
+    parent = greenlet.getcurrent().parent if greenlet else None
+    frame = parent.gr_frame if parent is not None else None
+    while frame is not None:
+        yield frame
+        frame = frame.f_back
+
+def stack_excerpt() -> str:
+    lines = []
+    for frame in _frames():
+        filename = frame.f_code.co_filename
+        if PROJECT_PATH in filename and not filename.endswith(IGNORED_FILES):
+            lines.append(f"{filename}:{frame.f_lineno} in {frame.f_code.co_name}")
+            if len(lines) == STACK_EXCERPT_DEPTH:
+                break
+    return "\n    ".join(lines) or "(sin frames del proyecto)"
+
+def inspecting() -> bool:
+    return SQL_DEBUG or QUERY_BUDGET is not None or _budget_override is not None
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if not SQL_DEBUG and _current.get() is None:
+        return
+    conn.info.setdefault("inspector_started", []).append(time.perf_counter())
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info.get("inspector_started")
+    if not started:
+        return
+    elapsed = time.perf_counter() - started.pop()
+    queries = _current.get()
+    route = queries.route if queries is not None else "(fuera de una peticion)"
+
+    if elapsed >= SLOW_QUERY_SECONDS:
+        logging.warning(
+            f"Consulta lenta ({elapsed:.3f}s) en {route}: {statement}\n"
+            f"  parametros: {repr(parameters)[:500]}\n    {stack_excerpt()}"
+        )
+
+    if queries is None:
+        return
+    queries.count += 1
+    shape = statement_shape(statement)
+    queries.shapes[shape] += 1
+    if queries.shapes[shape] >= N_PLUS_ONE_THRESHOLD and shape not in queries.reported:
+        queries.reported.add(shape)
+        logging.warning(
+            f"Posible N+1 en {route}: {queries.shapes[shape]} ejecuciones de {shape}\n    {stack_excerpt()}"
+        )
+
+def instrument_engine(engine: Engine):
+    if id(engine) in _instrumented_engines:
+        return
+    _instrumented_engines.add(id(engine))
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+def check_budget(queries: RequestQueries):
+    budget = _budget_override if _budget_override is not None else QUERY_BUDGET
+    if budget is None or queries.count <= budget:
+        return
+    message = f"{queries.route} ejecuto {queries.count} consultas (presupuesto {budget}): {dict(queries.shapes)}"
+    if QUERY_BUDGET_RAISE or _budget_override is not None:
+        raise QueryBudgetExceeded(message)
+    logging.error(message)
+
+@contextmanager
+def query_budget(budget: int):
+    global _budget_override
+    previous = _budget_override
+    _budget_override = budget
+    try:
+        yield
+    finally:
+        _budget_override = previous
+
+class QueryInspectorMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not inspecting():
+            await self.app(scope, receive, send)
+            return
+        queries = RequestQueries(scope)
+        token = _current.set(queries)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            _current.reset(token)
+        check_budget(queries)
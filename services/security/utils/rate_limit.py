@@ -0,0 +1,159 @@
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from fastapi import HTTPException, Request, status
+from services.security.utils.backends import load_backend
+import ipaddress
+import math
+import os
+import threading
+import time
+
+LOGIN_IP_BURST = float(os.getenv("LOGIN_IP_BURST", "20"))
+LOGIN_IP_RATE = float(os.getenv("LOGIN_IP_RATE", "1"))
+LOGIN_PHONE_BURST = float(os.getenv("LOGIN_PHONE_BURST", "5"))
+LOGIN_PHONE_RATE = float(os.getenv("LOGIN_PHONE_RATE", "0.1"))
+LOGIN_BACKOFF_AFTER = int(os.getenv("LOGIN_BACKOFF_AFTER", "3"))
+LOGIN_BACKOFF_BASE = float(os.getenv("LOGIN_BACKOFF_BASE", "1"))
+LOGIN_BACKOFF_MAX = float(os.getenv("LOGIN_BACKOFF_MAX", "900"))
+LOGIN_BACKOFF_WINDOW = float(os.getenv("LOGIN_BACKOFF_WINDOW", str(LOGIN_BACKOFF_MAX)))
+RATE_LIMIT_MAX_KEYS = int(os.getenv("RATE_LIMIT_MAX_KEYS", "100000"))
+RATE_LIMIT_BACKEND = os.getenv("RATE_LIMIT_BACKEND")
+TRUSTED_PROXIES = [
+    ipaddress.ip_network(proxy.strip(), strict=False)
+    for proxy in os.getenv("TRUSTED_PROXIES", "").split(",") if proxy.strip()
+]
+
+class RateLimitBackend(ABC):
+    @abstractmethod
+    def take(self, key: str, capacity: float, rate: float) -> float:
+        ...
+
+    @abstractmethod
+    def blocked(self, key: str) -> float:
+        ...
+
+    @abstractmethod
+    def penalize(self, key: str) -> float:
+        ...
+
+    @abstractmethod
+    def clear(self, key: str):
+        ...
+
+    def stats(self) -> dict:
+        return {}
+
+class MemoryRateLimiter(RateLimitBackend):
+    def __init__(self, max_keys: int = RATE_LIMIT_MAX_KEYS):
+        self.max_keys = max_keys
+        self._lock = threading.Lock()
+        self._buckets: "OrderedDict[str, list[float]]" = OrderedDict()
+        self._failures: "OrderedDict[str, list[float]]" = OrderedDict()
+
+    def _trim(self, entries: OrderedDict):
+        while len(entries) > self.max_keys:
+            entries.popitem(last=False)
+
+    def take(self, key: str, capacity: float, rate: float) -> float:
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated_at = self._buckets.pop(key, (capacity, now))
+            tokens = min(capacity, tokens + (now - updated_at) * rate)
+            retry_after = 0.0
+            if tokens >= 1:
+                tokens -= 1
+            else:
+                retry_after = (1 - tokens) / rate
+            self._buckets[key] = [tokens, now]
+            self._trim(self._buckets)
+            return retry_after
+
+    def blocked(self, key: str) -> float:
+        with self._lock:
+            entry = self._failures.get(key)
+            return max(0.0, entry[1] - time.monotonic()) if entry else 0.0
+
+    def penalize(self, key: str) -> float:
+        now = time.monotonic()
+        with self._lock:
+            count, _, last_failure = self._failures.pop(key, (0, now, now))
+            if now - last_failure > LOGIN_BACKOFF_WINDOW:
+                count = 0
+            count += 1
+            delay = 0.0
+            if count >= LOGIN_BACKOFF_AFTER:
+                delay = min(LOGIN_BACKOFF_MAX, LOGIN_BACKOFF_BASE * 2 ** (count - LOGIN_BACKOFF_AFTER))
+            self._failures[key] = [count, now + delay, now]
+            self._trim(self._failures)
+            return delay
+
+    def clear(self, key: str):
+        with self._lock:
+            self._failures.pop(key, None)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"buckets": len(self._buckets), "backoffs": len(self._failures)}
+
+rate_limiter: RateLimitBackend = load_backend(RATE_LIMIT_BACKEND, MemoryRateLimiter)
+
+_stats_lock = threading.Lock()
+_stats = {"allowed": 0, "rejected_ip": 0, "rejected_phone": 0, "rejected_backoff": 0, "failures": 0}
+
+def _count(name: str):
+    with _stats_lock:
+        _stats[name] += 1
+
+def _too_many_requests(retry_after: float) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+        detail="Demasiados intentos de inicio de sesion, intente nuevamente mas tarde",
+        headers={"Retry-After": str(max(1, math.ceil(retry_after)))}
+    )
+
+def _is_trusted_proxy(address: str | None) -> bool:
+    try:
+        ip = ipaddress.ip_address(address)
+    except ValueError:
+        return False
+    return any(ip in network for network in TRUSTED_PROXIES)
+
+def client_ip(request: Request) -> str | None:
+    address = request.client.host if request.client else None
+    if not _is_trusted_proxy(address):
+        return address
+    forwarded = [hop.strip() for hop in request.headers.get("x-forwarded-for", "").split(",") if hop.strip()]
+    for hop in reversed(forwarded):
+        address = hop
+        if not _is_trusted_proxy(hop):
+            break
+    return address
+
+def _backoff_key(client_ip: str | None, phone: str) -> str:
+    return f"login-failures:{phone}:{client_ip}"
+
+def check_login(client_ip: str | None, phone: str):
+    blocked = rate_limiter.blocked(_backoff_key(client_ip, phone))
+    if blocked:
+        _count("rejected_backoff")
+        raise _too_many_requests(blocked)
+    retry_after = rate_limiter.take(f"login-ip:{client_ip}", LOGIN_IP_BURST, LOGIN_IP_RATE)
+    if retry_after:
+        _count("rejected_ip")
+        raise _too_many_requests(retry_after)
+    retry_after = rate_limiter.take(f"login-phone:{phone}", LOGIN_PHONE_BURST, LOGIN_PHONE_RATE)
+    if retry_after:
+        _count("rejected_phone")
+        raise _too_many_requests(retry_after)
+    _count("allowed")
+
+def record_login_failure(client_ip: str | None, phone: str):
+    _count("failures")
+    rate_limiter.penalize(_backoff_key(client_ip, phone))
+
+def record_login_success(client_ip: str | None, phone: str):
+    rate_limiter.clear(_backoff_key(client_ip, phone))
+
+def get_rate_limit_stats() -> dict:
+    with _stats_lock:
+        return {**_stats, **rate_limiter.stats()}
@@ -0,0 +1,74 @@
+from sqlalchemy import null, select, union_all
+from sqlalchemy.ext.asyncio import AsyncSession
+from services.security.models.permission import Permission
+from services.security.models.role import Role
+from services.security.models.role_has_permissions import RoleHasPermissions
+from services.security.models.user_has_permissions import UserHasPermissions
+from services.security.models.user_has_roles import UserHasRoles
+from typing import Dict, FrozenSet, Iterable, List, Tuple
+import os
+import threading
+import time
+
+ROLE_PERMISSIONS_TTL = float(os.getenv("ROLE_PERMISSIONS_TTL", "60"))
+
+_lock = threading.Lock()
+_role_permissions: Dict[str, FrozenSet[str]] | None = None
+_loaded_at: float = 0.0
+
+async def load_role_permissions(db: AsyncSession) -> Dict[str, FrozenSet[str]]:
+    global _role_permissions, _loaded_at
+    result = await db.execute(
+        select(Role.name, Permission.action)
+        .select_from(Role)
+        .outerjoin(RoleHasPermissions, RoleHasPermissions.role_id == Role.id)
+        .outerjoin(Permission, Permission.id == RoleHasPermissions.permission_id)
+    )
+    rows = result.all()
+    index: Dict[str, set] = {}
+    for role_name, action in rows:
+        actions = index.setdefault(role_name, set())
+        if action is not None:
+            actions.add(action)
+    with _lock:
+        _role_permissions = {name: frozenset(actions) for name, actions in index.items()}
+        _loaded_at = time.monotonic()
+        return _role_permissions
+
+async def get_role_permissions(roles: Iterable[str], db: AsyncSession) -> FrozenSet[str]:
+    index = _role_permissions
+    if index is None or time.monotonic() - _loaded_at > ROLE_PERMISSIONS_TTL:
+        index = await load_role_permissions(db)
+    actions: set = set()
+    for role in roles:
+        actions |= index.get(role, frozenset())
+    return frozenset(actions)
+
+def invalidate_role_permissions():
+    global _role_permissions
+    with _lock:
+        _role_permissions = None
+
+async def resolve_user_permissions(user_id: int, db: AsyncSession) -> Tuple[List[str], List[str]]:
+    inherited = (
+        select(Role.name.label("role"), Permission.action.label("action"))
+        .select_from(UserHasRoles)
+        .join(Role, Role.id == UserHasRoles.role_id)
+        .outerjoin(RoleHasPermissions, RoleHasPermissions.role_id == Role.id)
+        .outerjoin(Permission, Permission.id == RoleHasPermissions.permission_id)
+        .where(UserHasRoles.user_id == user_id)
+    )
+    direct = (
+        select(null().label("role"), Permission.action.label("action"))
+        .select_from(UserHasPermissions)
+        .join(Permission, Permission.id == UserHasPermissions.permission_id)
+        .where(UserHasPermissions.user_id == user_id)
+    )
+    roles: Dict[str, None] = {}
+    actions: Dict[str, None] = {}
+    for role, action in (await db.execute(union_all(inherited, direct))).all():
+        if role is not None:
+            roles[role] = None
+        if action is not None:
+            actions[action] = None
+    return list(roles), list(actions)
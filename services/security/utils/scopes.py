@@ -0,0 +1,73 @@
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from services.security.models.permission import Permission
+from typing import Dict, Iterable, NamedTuple, Tuple
+import base64
+import hashlib
+import os
+import threading
+import time
+
+SCOPE_REGISTRY_TTL = float(os.getenv("SCOPE_REGISTRY_TTL", "300"))
+SCOPE_REGISTRY_MIN_RELOAD = 5.0
+
+class ScopeRegistry(NamedTuple):
+    version: str
+    bits: Dict[str, int]
+
+_lock = threading.Lock()
+_registry: ScopeRegistry | None = None
+_loaded_at: float = 0.0
+_compiled: Dict[Tuple[str, Tuple[str, ...]], int | None] = {}
+
+async def load_scope_registry(db: AsyncSession) -> ScopeRegistry:
+    global _registry, _loaded_at
+    rows = (await db.execute(select(Permission.id, Permission.action).order_by(Permission.id))).all()
+    digest = hashlib.sha256("\n".join(f"{id}:{action}" for id, action in rows).encode())
+    registry = ScopeRegistry(version=digest.hexdigest()[:12], bits={action: id for id, action in rows})
+    with _lock:
+        _registry = registry
+        _loaded_at = time.monotonic()
+        _compiled.clear()
+    return registry
+
+async def get_scope_registry(db: AsyncSession, version: str | None = None) -> ScopeRegistry:
+    registry = _registry
+    age = time.monotonic() - _loaded_at
+    if registry is None or age > SCOPE_REGISTRY_TTL or (
+            version is not None and version != registry.version and age > SCOPE_REGISTRY_MIN_RELOAD
+    ):
+        registry = await load_scope_registry(db)
+    return registry
+
+def invalidate_scope_registry():
+    global _registry
+    with _lock:
+        _registry = None
+        _compiled.clear()
+
+def scopes_to_mask(scopes: Iterable[str], registry: ScopeRegistry) -> int:
+    mask = 0
+    for scope in scopes:
+        bit = registry.bits.get(scope)
+        if bit is not None:
+            mask |= 1 << bit
+    return mask
+
+def mask_to_scopes(mask: int, registry: ScopeRegistry) -> list[str]:
+    return [scope for scope, bit in registry.bits.items() if mask >> bit & 1]
+
+def compile_scopes(scopes: Iterable[str], registry: ScopeRegistry) -> int | None:
+    key = (registry.version, tuple(scopes))
+    if key not in _compiled:
+        bits = [registry.bits.get(scope) for scope in key[1]]
+        _compiled[key] = None if None in bits else scopes_to_mask(key[1], registry)
+    return _compiled[key]
+
+def encode_mask(mask: int) -> str:
+    raw = mask.to_bytes((mask.bit_length() + 7) // 8, "little")
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+def decode_mask(value: str) -> int:
+    padded = value + "=" * (-len(value) % 4)
+    return int.from_bytes(base64.urlsafe_b64decode(padded), "little")
@@ -1,18 +1,18 @@
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer, SecurityScopes
-from passlib.exc import InvalidTokenError
-from sqlalchemy.orm import Session
+from jwt.exceptions import InvalidTokenError
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List
 #MODELS
-from services.security.models.role import Role
 from services.security.models.user import User
 from services.security.utils.dependency import get_db
-#ALL
-import os
-import jwt
-
-SECRET_KEY = os.getenv("SECRET_KEY")
-ALGORITHM = os.getenv("ALGORITHM")
+from services.security.utils.role_permissions import get_role_permissions
+from services.security.utils.tokens import decode_token, is_revoked, STATELESS_AUTH
+from services.security.utils.scopes import compile_scopes, decode_mask, get_scope_registry
+from services.security.utils.metrics import observe_stage
+import binascii
+import time
 
 oauth2_bearer = OAuth2PasswordBearer(
     tokenUrl="auth/token",
@@ -28,42 +28,62 @@ oauth2_bearer = OAuth2PasswordBearer(
         "update roles": "update roles",
         "delete roles": "delete roles",
         "assign roles": "assign roles",
-        "assign permissions": "assign_permissions"
+        "assign permissions": "assign_permissions",
+        "view profiles": "view profiles",
+        "introspect tokens": "introspect tokens"
     }
 )
 
 async def get_current_user(
         security_scopes: SecurityScopes,
         token: str = Depends(oauth2_bearer),
-        db: Session = Depends(get_db)
+        db: AsyncSession = Depends(get_db)
 ):
+    started = time.perf_counter()
     credentials_exception = HTTPException(
         status_code=status.HTTP_403_FORBIDDEN,
         detail="No esta autorizado para realizar esta accion",
         headers={"WWW-Authenticate": "Bearer"},
     )
     try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        payload = decode_token(token)
         scopes = payload.get("scopes", [])
         roles = payload.get("roles", [])
-        user = db.query(User).filter(User.id == payload.get("id")).first()
-        if user is None:
+        granted = decode_mask(payload["perms"]) if "perms" in payload else None
+        if is_revoked(payload.get("id"), payload.get("iat")):
             raise credentials_exception
-    except InvalidTokenError:
+        user = None
+        if not STATELESS_AUTH:
+            user = await db.scalar(select(User).where(User.id == payload.get("id")))
+            if user is None:
+                raise credentials_exception
+    except (InvalidTokenError, binascii.Error, TypeError):
         raise credentials_exception
 
+    if granted is not None:
+        if granted == 0 and roles == []:
+            raise credentials_exception
+        registry = await get_scope_registry(db, payload.get("sv"))
+        required = compile_scopes(security_scopes.scopes, registry)
+        check_mask(granted, required, "Su usuario no tiene los permisos necesarios para realizar esta accion")
+        observe_stage("authz", time.perf_counter() - started)
+        return user
+
     if scopes == [] and roles == []:
         raise credentials_exception
-    add_permissions(scopes, roles, db)
+    scopes = await add_permissions(scopes, roles, db)
     check_permissions(scopes, security_scopes, "Su usuario no tiene los permisos necesarios para realizar esta accion")
+    observe_stage("authz", time.perf_counter() - started)
+    return user
 
-def add_permissions(scopes: List[str], roles: List[str], db: Session):
+async def add_permissions(scopes: List[str], roles: List[str], db: AsyncSession) -> List[str]:
     if not roles == []:
-        for role in roles:
-            current_role = db.query(Role).filter(Role.name == role).first()
-            if current_role is not None:
-                actions: list[str] = [permission.action for permission in current_role.permissions]
-                scopes = list(set(actions) | set(scopes))
+        scopes = list(await get_role_permissions(roles, db) | set(scopes))
+    return scopes
+
+def check_mask(granted: int, required: int | None, message: str):
+    if required is None or granted & required != required:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail=message)
 
 def check_permissions(permissions: List[str],  security_scopes: SecurityScopes, message: str):
     if not permissions == []:
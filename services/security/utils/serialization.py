@@ -0,0 +1,26 @@
+from functools import lru_cache
+from pydantic import BaseModel, TypeAdapter
+from sqlalchemy import Row
+from typing import Any, Iterable, List, Type
+import os
+
+VALIDATE_ROWS = os.getenv("VALIDATE_ROWS", "false").lower() == "true"
+
+def projection(model: Any, schema: Type[BaseModel]) -> list:
+    return [getattr(model, name) for name in schema.model_fields]
+
+@lru_cache
+def _list_adapter(schema: Type[BaseModel]) -> TypeAdapter:
+    return TypeAdapter(List[schema])
+
+def rows_to_dicts(schema: Type[BaseModel], rows: Iterable[Row]) -> List[dict]:
+    items = [row._asdict() for row in rows]
+    if not VALIDATE_ROWS:
+        return items
+    adapter = _list_adapter(schema)
+    return adapter.dump_python(adapter.validate_python(items), mode="json")
+
+def row_to_dict(schema: Type[BaseModel], row: Row | None) -> dict | None:
+    if row is None:
+        return None
+    return rows_to_dicts(schema, [row])[0]
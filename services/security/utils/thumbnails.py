@@ -0,0 +1,120 @@
+from services.security.utils.files import BASE_PATH, AVATARS_PATH
+import logging
+import os
+import re
+import tempfile
+import threading
+
+THUMBNAIL_SIZES = (64, 128, 256)
+THUMBNAIL_CACHE_BYTES = int(os.getenv("THUMBNAIL_CACHE_BYTES", str(256 * 1024 * 1024)))
+THUMBNAIL_MAX_PIXELS = int(os.getenv("THUMBNAIL_MAX_PIXELS", str(4096 * 4096)))
+THUMBNAIL_FORMATS = {"webp": "WEBP", "jpg": "JPEG"}
+THUMBNAIL_NAME = re.compile(r"^(?P<digest>[0-9a-f]{64})_(?P<size>\d+)\.(?P<extension>webp|jpg)$")
+ORIGINAL_EXTENSIONS = ("png", "jpg", "gif", "webp")
+
+_lock = threading.Lock()
+
+def avatars_directory() -> str:
+    return os.path.join(BASE_PATH, AVATARS_PATH)
+
+def thumbnail_name(digest: str, size: int, accept: str | None) -> str:
+    extension = "webp" if accept and "image/webp" in accept else "jpg"
+    return f"{digest}_{size}.{extension}"
+
+def enforce_budget():
+    entries = []
+    with os.scandir(avatars_directory()) as scanned:
+        for entry in scanned:
+            if THUMBNAIL_NAME.match(entry.name):
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime, entry.name, stat.st_size))
+    entries.sort()
+    total_bytes = sum(size for _, _, size in entries)
+    for _, filename, size in entries[:-1]:
+        if total_bytes <= THUMBNAIL_CACHE_BYTES:
+            break
+        try:
+            os.remove(os.path.join(avatars_directory(), filename))
+        except FileNotFoundError:
+            pass
+        total_bytes -= size
+
+def _find_original(digest: str) -> str | None:
+    for extension in ORIGINAL_EXTENSIONS:
+        path = os.path.join(avatars_directory(), f"{digest}.{extension}")
+        if os.path.exists(path):
+            return path
+    return None
+
+def ensure_thumbnail(filename: str) -> str | None:
+    match = THUMBNAIL_NAME.match(filename)
+    if match is None or int(match.group("size")) not in THUMBNAIL_SIZES:
+        return None
+    path = os.path.join(avatars_directory(), filename)
+
+    if os.path.exists(path):
+        os.utime(path)
+        return path
+
+    original = _find_original(match.group("digest"))
+    if original is None:
+        return None
+
+    size = int(match.group("size"))
+    with _open_original(original, size) as image:
+        _render(image, size, match.group("extension"), path)
+    with _lock:
+        enforce_budget()
+    return path
+
+def _open_original(path: str, size: int):
+    from PIL import Image, ImageOps
+
+    image = Image.open(path)
+    width, height = image.size
+    if width * height > THUMBNAIL_MAX_PIXELS:
+        image.close()
+        raise ValueError(f"La imagen tiene {width}x{height} pixeles, el maximo es {THUMBNAIL_MAX_PIXELS}")
+    image.draft("RGB", (size, size))
+    transposed = ImageOps.exif_transpose(image)
+    transposed.load()
+    if transposed is not image:
+        image.close()
+    return transposed
+
+def _render(image, size: int, extension: str, path: str):
+    image_format = THUMBNAIL_FORMATS[extension]
+    thumbnail = image.copy()
+    thumbnail.thumbnail((size, size))
+    if image_format == "JPEG" and thumbnail.mode != "RGB":
+        thumbnail = thumbnail.convert("RGB")
+    descriptor, temporary_path = tempfile.mkstemp(dir=avatars_directory(), prefix=".thumbnail-")
+    try:
+        with os.fdopen(descriptor, "wb") as buffer:
+            thumbnail.save(buffer, format=image_format, quality=85)
+        os.chmod(temporary_path, 0o644)
+        os.replace(temporary_path, path)
+    except BaseException:
+        if os.path.exists(temporary_path):
+            os.remove(temporary_path)
+        raise
+
+def generate_thumbnails(relative_path: str):
+    digest = os.path.basename(relative_path).split(".")[0]
+    original = _find_original(digest)
+    if original is None:
+        return
+    try:
+        with _open_original(original, max(THUMBNAIL_SIZES)) as image:
+            for size in THUMBNAIL_SIZES:
+                for extension in THUMBNAIL_FORMATS:
+                    path = os.path.join(avatars_directory(), f"{digest}_{size}.{extension}")
+                    if not os.path.exists(path):
+                        _render(image, size, extension, path)
+    except Exception as e:
+        logging.warning(f"Error generating thumbnails for {digest}: {e}")
+    with _lock:
+        enforce_budget()
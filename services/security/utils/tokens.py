@@ -0,0 +1,98 @@
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from services.security.utils.backends import load_backend
+from services.security.utils.metrics import observe_stage
+from services.security.utils.keys import is_asymmetric, signing_key, verification_key, SECRET_KEY, ALGORITHM
+import os
+import threading
+import time
+import jwt
+
+STATELESS_AUTH = os.getenv("STATELESS_AUTH", "False").lower() == "true"
+TOKEN_CACHE_SIZE = int(os.getenv("TOKEN_CACHE_SIZE", "10000"))
+REVOCATION_TTL = float(os.getenv("REVOCATION_TTL", "3600"))
+REVOCATION_BACKEND = os.getenv("REVOCATION_BACKEND")
+
+class RevocationBackend(ABC):
+    @abstractmethod
+    def revoke(self, user_id: int, ttl: float):
+        ...
+
+    @abstractmethod
+    def revoked_at(self, user_id: int) -> float | None:
+        ...
+
+class MemoryRevocationList(RevocationBackend):
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._revoked: dict[int, tuple[float, float]] = {}
+
+    def revoke(self, user_id: int, ttl: float):
+        now = time.time()
+        with self._lock:
+            self._revoked = {id: entry for id, entry in self._revoked.items() if entry[1] > now}
+            self._revoked[user_id] = (now, now + ttl)
+
+    def revoked_at(self, user_id: int) -> float | None:
+        with self._lock:
+            entry = self._revoked.get(user_id)
+        return entry[0] if entry is not None and entry[1] > time.time() else None
+
+revocation_list: RevocationBackend = load_backend(REVOCATION_BACKEND, MemoryRevocationList)
+
+_lock = threading.Lock()
+_decoded_tokens: "OrderedDict[str, dict]" = OrderedDict()
+_stats = {"hits": 0, "misses": 0}
+
+def decode_token(token: str, memoize: bool = True) -> dict:
+    now = time.time()
+    with _lock:
+        payload = _decoded_tokens.get(token)
+        if payload is not None:
+            if payload.get("exp", 0) > now:
+                _decoded_tokens.move_to_end(token)
+                _stats["hits"] += 1
+                return payload
+            del _decoded_tokens[token]
+        _stats["misses"] += 1
+
+    started = time.perf_counter()
+    key, algorithms = verification_key(jwt.get_unverified_header(token).get("kid"))
+    payload = jwt.decode(token, key, algorithms=algorithms)
+    observe_stage("jwt_decode", time.perf_counter() - started)
+
+    if memoize and "exp" in payload:
+        with _lock:
+            _decoded_tokens[token] = payload
+            while len(_decoded_tokens) > TOKEN_CACHE_SIZE:
+                _decoded_tokens.popitem(last=False)
+    return payload
+
+def encode_token(payload: dict) -> str:
+    if not is_asymmetric():
+        return jwt.encode(payload, SECRET_KEY, algorithm=ALGORITHM)
+    key = signing_key()
+    return jwt.encode(payload, key.private_key, algorithm=key.algorithm, headers={"kid": key.kid})
+
+def check_stateless_auth():
+    if STATELESS_AUTH and not REVOCATION_BACKEND:
+        raise RuntimeError(
+            "STATELESS_AUTH requiere un REVOCATION_BACKEND compartido entre procesos; "
+            "la lista en memoria no revoca los tokens en otros workers ni tras un reinicio"
+        )
+
+def revoke_user(user_id: int):
+    revocation_list.revoke(user_id, REVOCATION_TTL)
+
+def is_revoked(user_id: int, issued_at: float | None) -> bool:
+    revoked_at = revocation_list.revoked_at(user_id)
+    return revoked_at is not None and (issued_at or 0) <= revoked_at
+
+def get_token_cache_stats() -> dict:
+    with _lock:
+        lookups = _stats["hits"] + _stats["misses"]
+        return {
+            "size": len(_decoded_tokens),
+            **_stats,
+            "hit_ratio": _stats["hits"] / lookups if lookups else 0.0,
+        }
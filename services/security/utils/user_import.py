@@ -0,0 +1,95 @@
+from starlette.concurrency import run_in_threadpool
+from starlette.requests import Request
+from tempfile import SpooledTemporaryFile
+from typing import AsyncIterator, BinaryIO, Tuple
+import csv
+import json
+import os
+
+IMPORT_SPOOL_SIZE = int(os.getenv("IMPORT_SPOOL_SIZE", str(1024 * 1024)))
+IMPORT_CHUNK_SIZE = 64 * 1024
+
+CSV_TYPES = ("text/csv", "application/csv")
+NDJSON_TYPES = ("application/x-ndjson", "application/ndjson", "application/jsonl", "application/json-lines")
+
+def detect_format(content_type: str) -> str | None:
+    media_type = content_type.split(";")[0].strip().lower()
+    if media_type in CSV_TYPES:
+        return "csv"
+    if media_type in NDJSON_TYPES:
+        return "ndjson"
+    return None
+
+async def spool_body(request: Request) -> BinaryIO:
+    spool = SpooledTemporaryFile(max_size=IMPORT_SPOOL_SIZE)
+    async for chunk in request.stream():
+        await run_in_threadpool(spool.write, chunk)
+    spool.seek(0)
+    return spool
+
+async def iter_file(file: BinaryIO) -> AsyncIterator[bytes]:
+    try:
+        while chunk := await run_in_threadpool(file.read, IMPORT_CHUNK_SIZE):
+            yield chunk
+    finally:
+        file.close()
+
+async def iter_lines(stream: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+    buffer = b""
+    async for chunk in stream:
+        buffer += chunk
+        lines = buffer.split(b"\n")
+        buffer = lines.pop()
+        for line in lines:
+            yield line
+    if buffer:
+        yield buffer
+
+async def iter_logical_lines(stream: AsyncIterator[bytes], file_format: str) -> AsyncIterator[Tuple[int, str | None, str | None]]:
+    line_number = 0
+    pending: list[str] = []
+    quotes = 0
+    async for raw in iter_lines(stream):
+        line_number += 1
+        try:
+            line = raw.decode("utf-8").rstrip("\r")
+        except UnicodeDecodeError:
+            yield line_number - len(pending), None, "la linea no es texto UTF-8 valido"
+            pending, quotes = [], 0
+            continue
+        if file_format != "csv":
+            yield line_number, line, None
+            continue
+        pending.append(line)
+        quotes += line.count('"')
+        if quotes % 2 == 0:
+            yield line_number - len(pending) + 1, "\n".join(pending), None
+            pending, quotes = [], 0
+    if pending:
+        yield line_number - len(pending) + 1, None, "hay un campo entre comillas sin cerrar"
+
+async def iter_records(stream: AsyncIterator[bytes], file_format: str) -> AsyncIterator[Tuple[int, dict | None, str | None]]:
+    header = None
+    async for line_number, line, error in iter_logical_lines(stream, file_format):
+        if error is not None:
+            yield line_number, None, error
+            continue
+        if not line.strip():
+            continue
+        try:
+            if file_format == "ndjson":
+                record = json.loads(line)
+                if not isinstance(record, dict):
+                    raise ValueError("se esperaba un objeto JSON")
+            else:
+                values = next(csv.reader([line]))
+                if header is None:
+                    header = [value.strip() for value in values]
+                    continue
+                if len(values) != len(header):
+                    raise ValueError(f"se esperaban {len(header)} columnas y se recibieron {len(values)}")
+                record = {key: value for key, value in zip(header, values) if value != ""}
+        except ValueError as e:
+            yield line_number, None, str(e)
+            continue
+        yield line_number, record, None
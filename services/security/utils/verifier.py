@@ -0,0 +1,44 @@
+from jwt import PyJWKClient
+from typing import Dict, Iterable
+import base64
+import json
+import threading
+import time
+import urllib.request
+import jwt
+
+class TokenVerifier:
+    def __init__(self, base_url: str, lifespan: float = 300, algorithms: Iterable[str] = ("EdDSA", "ES256")):
+        self.base_url = base_url.rstrip("/")
+        self.lifespan = lifespan
+        self.algorithms = list(algorithms)
+        self._jwks = PyJWKClient(f"{self.base_url}/.well-known/jwks.json", cache_jwk_set=True, lifespan=lifespan)
+        self._lock = threading.Lock()
+        self._scopes: Dict[str, int] = {}
+        self._scopes_version: str | None = None
+        self._scopes_loaded_at = 0.0
+
+    def verify(self, token: str) -> dict:
+        signing_key = self._jwks.get_signing_key_from_jwt(token)
+        return jwt.decode(token, signing_key.key, algorithms=self.algorithms)
+
+    def _load_scopes(self):
+        with urllib.request.urlopen(f"{self.base_url}/.well-known/scopes.json", timeout=10) as response:
+            document = json.load(response)
+        with self._lock:
+            self._scopes = document["scopes"]
+            self._scopes_version = document["version"]
+            self._scopes_loaded_at = time.monotonic()
+
+    def scopes(self, payload: dict) -> set[str]:
+        if "perms" not in payload:
+            return set(payload.get("scopes", []))
+        age = time.monotonic() - self._scopes_loaded_at
+        if age > self.lifespan or (payload.get("sv") != self._scopes_version and age > 5):
+            self._load_scopes()
+        value = payload["perms"]
+        mask = int.from_bytes(base64.urlsafe_b64decode(value + "=" * (-len(value) % 4)), "little")
+        return {action for action, bit in self._scopes.items() if mask >> bit & 1}
+
+    def has_scopes(self, payload: dict, required: Iterable[str]) -> bool:
+        return set(required) <= self.scopes(payload)